@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for fetch_metrics.py.
+Compares cold import time of the module with heavy dependencies deferred (current)
+against importing them eagerly at load time (previous behaviour).
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ['yfinance', 'pandas', 'tabulate']
+
+SCENARIOS = {
+    'lazy (current)': "import fetch_metrics",
+    'eager (before)': "import fetch_metrics, " + ", ".join(HEAVY_MODULES)
+}
+
+
+def time_import(statement: str, runs: int) -> list:
+    """
+    Time a statement in fresh interpreters (so every run is a cold import).
+    
+    Args:
+        statement: Python statement to run
+        runs: Number of interpreter launches
+    
+    Returns:
+        Wall times in milliseconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=REPO_DIR, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    """Run each scenario and print median / min startup times."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    
+    baseline = statistics.median(time_import("pass", runs))
+    print(f"Interpreter startup (python -c pass): {baseline:.0f} ms median over {runs} runs\n")
+    
+    results = {}
+    for name, statement in SCENARIOS.items():
+        timings = time_import(statement, runs)
+        results[name] = statistics.median(timings)
+        print(f"{name:<16} median {results[name]:7.0f} ms   min {min(timings):7.0f} ms")
+    
+    saved = results['eager (before)'] - results['lazy (current)']
+    print(f"\n⏱️  Deferred imports save {saved:.0f} ms per cold start")
+
+
+if __name__ == "__main__":
+    main()
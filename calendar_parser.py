@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Calendar Parser
+Streaming lxml parser for investing.com economic calendar rows: only one table row is held
+in memory at a time, and rows outside the date window, of another currency or below high
+impact are rejected before their other cells are read.
+"""
+
+import io
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Row and cell classes of the calendar table
+EVENT_ROW_CLASS = 'js-event-item'
+CELL_CLASSES = ['flagCur', 'sentiment', 'event', 'time', 'fore', 'act', 'prev']
+
+# Kept rows: US events with high (bull3) impact
+CURRENCY = 'USD'
+IMPACT_KEY = 'bull3'
+
+
+def _cell_text(cell: Any) -> str:
+    """Cell text with every text node stripped (same as BeautifulSoup's get_text(strip=True))."""
+    return ''.join(text.strip() for text in cell.itertext())
+
+
+def _value(cell: Any) -> Optional[str]:
+    """Forecast/actual/previous cell value (None when the cell is missing or blank)."""
+    if cell is None:
+        return None
+    return _cell_text(cell) or None
+
+
+def _index_cells(row: Any) -> Dict[str, Any]:
+    """Map the row's cells of interest by class, walking its cells once."""
+    cells = {}
+    for cell in row.iterchildren('td'):
+        for name in (cell.get('class') or '').split():
+            if name in CELL_CLASSES and name not in cells:
+                cells[name] = cell
+    return cells
+
+
+def _parse_row(row: Any, window_start: datetime, window_end: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Parse one event row, checked in order of cost: its datetime attribute against the window,
+    the impact cell's data-img_key attribute, then the currency cell's text. Only rows passing
+    all three have their name, time and value cells read.
+    
+    Returns:
+        Row dictionary, or None if the row is rejected
+    """
+    # Datetime from the data attribute (most reliable; format: YYYY/MM/DD HH:mm:ss)
+    event_datetime_str = row.get('data-event-datetime', '')
+    if not event_datetime_str:
+        return None
+    try:
+        event_datetime = datetime.strptime(event_datetime_str, '%Y/%m/%d %H:%M:%S')
+    except ValueError:
+        print(f"⚠️  Could not parse datetime: {event_datetime_str}")
+        return None
+    if event_datetime < window_start or event_datetime > window_end:
+        return None
+    
+    cells = _index_cells(row)
+    
+    # Impact from the sentiment cell's data-img_key attribute (bull1, bull2, bull3)
+    impact_cell = cells.get('sentiment')
+    if impact_cell is None or impact_cell.get('data-img_key', '') != IMPACT_KEY:
+        return None
+    
+    # Currency / country
+    currency_cell = cells.get('flagCur')
+    if currency_cell is None or _cell_text(currency_cell) != CURRENCY:
+        return None
+    
+    name_cell = cells.get('event')
+    name = ' '.join(_cell_text(name_cell).split()) if name_cell is not None else "Unknown Event"
+    
+    time_cell = cells.get('time')
+    event_time = _cell_text(time_cell) if time_cell is not None else event_datetime.strftime('%H:%M')
+    
+    return {
+        "datetime": event_datetime,
+        "name": name,
+        "time": event_time,
+        "forecast": _value(cells.get('fore')),
+        "actual": _value(cells.get('act')),
+        "previous": _value(cells.get('prev'))
+    }
+
+
+def parse_event_rows(html: str, window_start: datetime, window_end: datetime) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Parse calendar rows as a stream, without building the whole document.
+    
+    lxml's iterparse hands over each <tr> once it is complete; event rows are parsed and
+    every row is then cleared and detached, so at most one row's subtree is in memory.
+    Date headers, ads markup and other rows are dropped as they stream past.
+    
+    Args:
+        html: Calendar HTML (the 'data' field of getCalendarFilteredData)
+        window_start: Earliest event datetime to keep
+        window_end: Latest event datetime to keep
+    
+    Returns:
+        Tuple of (number of event rows seen, kept rows as dictionaries with datetime,
+        name, time, forecast, actual and previous)
+    """
+    from lxml import etree  # Deferred: only calendar runs need lxml
+    
+    if not html.strip():
+        return 0, []
+    
+    total = 0
+    rows = []
+    source = io.BytesIO(html.encode('utf-8'))
+    for _, row in etree.iterparse(source, events=('end',), tag='tr', html=True, encoding='utf-8'):
+        try:
+            if EVENT_ROW_CLASS in (row.get('class') or '').split():
+                total += 1
+                parsed = _parse_row(row, window_start, window_end)
+                if parsed is not None:
+                    rows.append(parsed)
+        except Exception as e:
+            print(f"⚠️  Failed to parse event row: {e}")
+        finally:
+            # Free the row and the already-processed siblings before it
+            row.clear(keep_tail=True)
+            parent = row.getparent()
+            if parent is not None:
+                while row.getprevious() is not None:
+                    del parent[0]
+    
+    return total, rows
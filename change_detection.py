@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Change Detection
+Vectorized threshold evaluation: compares a run's metric values with the previous run's
+in one NumPy pass, however many series are tracked.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def evaluate_thresholds(metrics: Sequence[str], old_metrics: Dict[str, Any], new_metrics: Dict[str, Any],
+                        thresholds: Dict[str, float],
+                        absolute_metrics: Sequence[str] = ()) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """
+    Find the metrics whose change breaches their notification threshold.
+    
+    Rules per metric:
+    - A value appearing or disappearing (one side None) counts as changed, without a delta
+    - Identical values never count
+    - Absolute-threshold metrics compare |new - old| with the threshold, the others |% change|
+      (the % change is 0 when the old value is 0)
+    - A change counts when it is >= the threshold (so a threshold of 0 means any change)
+    
+    Args:
+        metrics: Metric keys to evaluate, in report order
+        old_metrics: Previous run's metric values
+        new_metrics: This run's metric values
+        thresholds: Threshold per metric (missing = 0)
+        absolute_metrics: Metrics with an absolute threshold instead of a percentage one
+    
+    Returns:
+        Tuple of (changed metric keys in the order given, {metric: {'old', 'new', 'pct_change',
+        'direction'}} for the metrics that breached a threshold)
+    """
+    import numpy as np  # Deferred: only change detection needs NumPy here
+    
+    metrics = list(metrics)
+    if not metrics:
+        return [], {}
+    
+    old_raw = [old_metrics.get(metric) for metric in metrics]
+    new_raw = [new_metrics.get(metric) for metric in metrics]
+    
+    old_missing = np.array([value is None for value in old_raw])
+    new_missing = np.array([value is None for value in new_raw])
+    old = np.array([0.0 if value is None else value for value in old_raw], dtype=np.float64)
+    new = np.array([0.0 if value is None else value for value in new_raw], dtype=np.float64)
+    limit = np.array([thresholds.get(metric, 0) for metric in metrics], dtype=np.float64)
+    absolute_metrics = set(absolute_metrics)
+    absolute = np.array([metric in absolute_metrics for metric in metrics])
+    
+    # Appeared or disappeared
+    presence_changed = old_missing != new_missing
+    
+    comparable = ~(old_missing | new_missing) & (old != new)
+    with np.errstate(all='ignore'):  # inf/NaN compare like Python floats
+        delta = new - old
+        pct = np.where(old != 0, delta / np.where(old != 0, old, 1.0) * 100, 0.0)
+    measured = np.where(absolute, np.abs(delta), np.abs(pct))
+    breached = comparable & (measured >= limit)
+    
+    changed = [metrics[i] for i in np.flatnonzero(presence_changed | breached)]
+    changes = {
+        metrics[i]: {
+            'old': old_raw[i],
+            'new': new_raw[i],
+            'pct_change': float(pct[i]),
+            'direction': '▲' if new[i] > old[i] else '▼'
+        }
+        for i in np.flatnonzero(breached)
+    }
+    return changed, changes
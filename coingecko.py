@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - CoinGecko Adapter
+One batched markets query plus /global; the metric engine issues each once per run and shares it.
+"""
+
+from typing import Any, Dict
+from http_client import HttpClient
+from response_cache import ResponseCache
+
+
+COINGECKO_API = "https://api.coingecko.com/api/v3"
+
+# Coins whose price / market cap the dashboard needs
+MARKET_COIN_IDS = ['bitcoin', 'tether']
+
+
+class CoinGeckoClient:
+    """Fetches CoinGecko market data (the markets and /global requests of the metric registry)."""
+    
+    def __init__(self, http: HttpClient, response_cache: ResponseCache):
+        """
+        Initialize the CoinGecko adapter.
+        
+        Args:
+            http: Shared pooled HTTP client
+            response_cache: Conditional-request cache
+        """
+        self.http = http
+        self.response_cache = response_cache
+    
+    def _get_json(self, url: str, parse) -> Any:
+        """GET a CoinGecko endpoint through the response cache and reduce it with parse."""
+        return self.response_cache.fetch(
+            url,
+            lambda headers: self.http.get(url, headers=headers),
+            lambda response: parse(response.json())
+        )
+    
+    def markets(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get price and market cap for the tracked coins, in one batched /coins/markets query
+        for all MARKET_COIN_IDS (a few hundred bytes per coin).
+        
+        Returns:
+            Dictionary of coin ID -> {'current_price', 'market_cap'} in USD
+        """
+        url = f"{COINGECKO_API}/coins/markets?vs_currency=usd&ids={','.join(MARKET_COIN_IDS)}"
+        return self._get_json(url, lambda data: {
+            coin['id']: {
+                'current_price': float(coin['current_price']),
+                'market_cap': float(coin['market_cap'])
+            }
+            for coin in data
+        })
+    
+    def global_market(self) -> Dict[str, float]:
+        """
+        Get global crypto market data (total crypto market cap).
+        
+        Returns:
+            Dictionary with 'total_market_cap_usd'
+        """
+        url = f"{COINGECKO_API}/global"
+        return self._get_json(url, lambda data: {
+            'total_market_cap_usd': float(data['data']['total_market_cap']['usd'])
+        })
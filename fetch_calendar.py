@@ -4,14 +4,46 @@ Monthly Catalyst Radar - Economic Calendar Fetcher
 Scrapes US economic events from investing.com with dual-trigger notifications.
 """
 
+import copy
 import json
 import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import requests
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlencode
 import cloudscraper
-from bs4 import BeautifulSoup
+from calendar_parser import parse_event_rows
+from http_client import get_http_client, submit_with_context
+from output_writer import write_json, write_shards
+from resilience import get_circuit_breaker
+from response_cache import get_response_cache
+from sqlite_store import get_sqlite_store
+from state_store import cache_path, load_state, save_state
+
+
+INVESTING_HOST = "www.investing.com"
+
+# Every run refreshes the hot window (whole days from 48h ago to 24h ahead); the full
+# window (2 days ago to +30 days) is only re-scraped every FULL_REFRESH_HOURS
+HOT_WINDOW_BEFORE_HOURS = 48
+HOT_WINDOW_AFTER_HOURS = 24
+FULL_REFRESH_HOURS = 6
+
+# Calendar window is fetched in chunks of this many days, a few at a time
+CHUNK_DAYS = 7
+MAX_CONCURRENT_CHUNKS = 3
+
+# Safety cap on limit_from pages per chunk
+MAX_PAGES_PER_CHUNK = 20
+
+# Content hashes of calendar pages (see _parse_page), kept for chunks ending in the last few days
+PAGE_STATE_FILE = cache_path('calendar_pages.json')
+PAGE_STATE_DAYS = 3
+
+# Per-week shards for the frontend (see output_writer.write_shards)
+CALENDAR_SHARD_DIR = "shards/calendar"
 
 
 class EconomicCalendarFetcher:
@@ -27,6 +59,17 @@ class EconomicCalendarFetcher:
         """
         self.telegram_bot_token = telegram_bot_token
         self.telegram_chat_id = telegram_chat_id
+        self.http = get_http_client()  # Shared pooled client for Telegram
+        self.response_cache = get_response_cache()
+        self.breaker = get_circuit_breaker()  # Persistent per-host circuit breaker
+        self.store = get_sqlite_store()  # Optional SQLite storage (COCKPIT_DB)
+        
+        # Content hash and parsed result of every calendar page (per chunk and limit_from),
+        # so unchanged responses are not parsed again; persisted once the run has saved
+        self.page_state = load_state(PAGE_STATE_FILE, {"pages": {}, "full_refresh_at": None})
+        self.pages_changed = 0  # Pages of this run whose content differs from the stored hash
+        self.flags_changed = 0  # Notification flags set this run
+        self._lock = threading.Lock()
         self.scraper = cloudscraper.create_scraper(
             browser={
                 'browser': 'chrome',
@@ -60,6 +103,17 @@ class EconomicCalendarFetcher:
             Existing data dictionary or empty structure
         """
         try:
+            if self.store is not None:
+                # Scrapes reach back at most a couple of days, so older events can't match
+                since = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+                events = self.store.load_events(start_date=since)
+                if events:
+                    return {
+                        "updated_at": self.store.get_meta('calendar_updated_at'),
+                        "full_refresh_at": self.store.get_meta('calendar_full_refresh_at') or None,
+                        "events": events
+                    }
+            
             with open(filename, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
@@ -69,196 +123,319 @@ class EconomicCalendarFetcher:
             print(f"⚠️  Failed to load existing data: {e}")
             return {"updated_at": None, "events": []}
     
-    def fetch_calendar_events(self) -> List[Dict[str, Any]]:
+    def needs_full_refresh(self, old_data: Dict[str, Any]) -> bool:
         """
-        Scrape economic calendar from investing.com.
+        Whether this run should scrape the full window rather than just the hot window.
+        
+        Args:
+            old_data: Existing calendar data
         
         Returns:
-            List of event dictionaries
+            True if the last full refresh is missing or older than FULL_REFRESH_HOURS
         """
-        events = []
+        # Unchanged full refreshes are only recorded in the page state (nothing else is written)
+        last = None
+        for full_refresh_at in (old_data.get('full_refresh_at'), self.page_state.get('full_refresh_at')):
+            try:
+                refreshed = datetime.fromisoformat(full_refresh_at.rstrip('Z'))
+            except (AttributeError, ValueError):
+                continue
+            last = refreshed if last is None else max(last, refreshed)
+        return last is None or datetime.utcnow() - last >= timedelta(hours=FULL_REFRESH_HOURS)
+    
+    def hot_window(self) -> Tuple[datetime, datetime]:
+        """
+        Window refreshed on every run: whole days from HOT_WINDOW_BEFORE_HOURS ago to
+        HOT_WINDOW_AFTER_HOURS ahead (where new actuals and revised forecasts appear).
+        
+        Returns:
+            Tuple of (start of the first day, end of the last day)
+        """
+        now = datetime.now()
+        first_day = (now - timedelta(hours=HOT_WINDOW_BEFORE_HOURS)).replace(hour=0, minute=0, second=0, microsecond=0)
+        last_day = (now + timedelta(hours=HOT_WINDOW_AFTER_HOURS)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return first_day, last_day + timedelta(days=1) - timedelta(seconds=1)
+    
+    def fetch_calendar_events(self, start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Scrape economic calendar from investing.com.
         
-        # Calculate date range (2 days ago + 30 days forward)
+        The window is split into CHUNK_DAYS chunks fetched concurrently (at most
+        MAX_CONCURRENT_CHUNKS at a time); each chunk is paged through until investing.com
+        reports no more rows. Events are deduplicated by ID across chunks.
+        
+        Args:
+            start_date: Start of the window (defaults to the full window: 2 days ago)
+            end_date: End of the window (defaults to 30 days after the start)
+        
+        Returns:
+            List of event dictionaries, or None if the fetch failed (or the circuit is open)
+        """
+        # Calculate date range (2 days ago + 30 days forward, in whole days so the window,
+        # and with it the page hashes, stays the same all day)
         # Start from 2 days ago to capture actual data for recently completed events
-        start_date = datetime.now() - timedelta(days=2)
-        end_date = start_date + timedelta(days=30)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = start_date or today - timedelta(days=2)
+        end_date = end_date or start_date + timedelta(days=31) - timedelta(seconds=1)
         
         print(f"🔄 Fetching economic calendar from {start_date.date()} to {end_date.date()}...")
         
+        # While investing.com's circuit is open, skip the scrape (no timeout wait); main keeps existing data
+        if not self.breaker.available(INVESTING_HOST):
+            print(f"🔌 Circuit open for {INVESTING_HOST} - skipping fetch")
+            return None
+        
+        # Consecutive chunks of whole days covering the window
+        chunks = []
+        chunk_start = start_date
+        while chunk_start.date() <= end_date.date():
+            chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end_date)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_start + timedelta(days=CHUNK_DAYS)
+        
+        self.pages_changed = 0
         try:
-            # Investing.com AJAX endpoint for custom date ranges
-            url = "https://www.investing.com/economic-calendar/Service/getCalendarFilteredData"
-            
-            # Format dates as YYYY-MM-DD
-            date_from = start_date.strftime('%Y-%m-%d')
-            date_to = end_date.strftime('%Y-%m-%d')
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CHUNKS) as executor:
+                futures = [
+                    submit_with_context(executor, self.fetch_chunk, chunk_from, chunk_to, start_date, end_date)
+                    for chunk_from, chunk_to in chunks
+                ]
+                # All or nothing: merge_with_existing replaces the event list, so a missing
+                # chunk would drop its events
+                chunk_events = [future.result() for future in futures]
+        except Exception as e:
+            print(f"❌ Failed to fetch calendar: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+        
+        # Chunks are in date order; the first copy of an event wins (chunk edges can overlap
+        # because of the timezone shift)
+        events = {}
+        for chunk in chunk_events:
+            for event in chunk:
+                events.setdefault(event['id'], event)
+        events = list(events.values())
+        
+        print(f"✅ Scraped {len(events)} US High/Medium impact events "
+              f"({len(chunks)} chunks, {self.pages_changed} changed pages)")
+        return events
+    
+    @property
+    def unchanged(self) -> bool:
+        """Whether every page of the last fetch matched its stored content hash."""
+        return self.pages_changed == 0
+    
+    def save_page_state(self, full_refresh: bool = False):
+        """
+        Persist the page hashes (call once the run's data is saved, so a failed run
+        re-parses next time). Pages whose chunk ended a few days ago are dropped.
+        
+        Args:
+            full_refresh: Record this run as a full refresh
+        """
+        cutoff = (datetime.now() - timedelta(days=PAGE_STATE_DAYS)).strftime('%Y-%m-%d')
+        pages = self.page_state.get("pages", {})
+        self.page_state["pages"] = {key: page for key, page in pages.items() if page["date_to"] >= cutoff}
+        if full_refresh:
+            self.page_state["full_refresh_at"] = datetime.utcnow().isoformat() + "Z"
+        save_state(PAGE_STATE_FILE, self.page_state)
+    
+    def fetch_chunk(self, chunk_from: datetime, chunk_to: datetime,
+                    start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """
+        Fetch one chunk of the calendar, paging through limit_from until it is exhausted.
+        
+        Args:
+            chunk_from: First day of the chunk
+            chunk_to: Last day of the chunk
+            start_date: Start of the whole window
+            end_date: End of the whole window
+        
+        Returns:
+            List of event dictionaries in the chunk
+        """
+        # Investing.com AJAX endpoint for custom date ranges
+        url = f"https://{INVESTING_HOST}/economic-calendar/Service/getCalendarFilteredData"
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': '*/*',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-Requested-With': 'XMLHttpRequest',
+            'Origin': 'https://www.investing.com',
+            'Referer': 'https://www.investing.com/economic-calendar/'
+        }
+        
+        # POST data for custom date range (dates formatted as YYYY-MM-DD)
+        data = {
+            'dateFrom': chunk_from.strftime('%Y-%m-%d'),
+            'dateTo': chunk_to.strftime('%Y-%m-%d'),
+            'currentTab': 'custom',
+            'limit_from': '0',
+            'timeZone': '8'  # GMT+8 (Singapore/Asia timezone)
+        }
+        
+        events = []
+        for page in range(MAX_PAGES_PER_CHUNK):
+            print(f"Fetching calendar data: {data['dateFrom']} to {data['dateTo']} (page {page + 1})")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': '*/*',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Origin': 'https://www.investing.com',
-                'Referer': 'https://www.investing.com/economic-calendar/'
-            }
+            # Reuse the parsed page when investing.com answers 304 Not Modified
+            page_data = dict(data)
+            cache_key = f"{url}?{urlencode(sorted(page_data.items()))}"
+            result = self.breaker.call(INVESTING_HOST, lambda: self.response_cache.fetch(
+                cache_key,
+                lambda extra_headers: self.scraper.post(url, headers={**headers, **extra_headers}, data=page_data, timeout=30),
+                lambda response: self._parse_page(cache_key, data['dateTo'], response, start_date, end_date)
+            ))
+            events.extend(result["events"])
             
-            # POST data for custom date range
-            data = {
-                'dateFrom': date_from,
-                'dateTo': date_to,
-                'currentTab': 'custom',
-                'limit_from': '0',
-                'timeZone': '8'  # GMT+8 (Singapore/Asia timezone)
+            if result["next_scope"] is None:
+                return events
+            data['limit_from'] = str(page + 1)
+            data['last_time_scope'] = result["next_scope"]
+        
+        print(f"⚠️  Stopped paging {data['dateFrom']} to {data['dateTo']} after {MAX_PAGES_PER_CHUNK} pages")
+        return events
+    
+    def _parse_page(self, cache_key: str, date_to: str, response,
+                    start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """
+        Parse one calendar page, or reuse its stored result if the raw response (and the
+        window it is filtered to) hashes the same as last time.
+        
+        Args:
+            cache_key: Page request key
+            date_to: Last day of the page's chunk (for pruning)
+            response: getCalendarFilteredData response
+            start_date: Start of the whole window
+            end_date: End of the whole window
+        
+        Returns:
+            Dictionary with the page's events and next_scope (pagination cursor)
+        """
+        digest = hashlib.sha256(
+            f"{start_date.isoformat()}|{end_date.isoformat()}|".encode() + response.content
+        ).hexdigest()
+        with self._lock:
+            page = self.page_state["pages"].get(cache_key)
+        if page is not None and page["hash"] == digest:
+            return copy.deepcopy(page["result"])  # Callers may mutate the events
+        
+        result = {
+            "events": self.parse_calendar_response(response, start_date, end_date),
+            "next_scope": self._next_page_scope(response)
+        }
+        with self._lock:
+            self.page_state["pages"][cache_key] = {
+                "hash": digest,
+                "date_to": date_to,
+                "result": copy.deepcopy(result)
             }
+            self.pages_changed += 1
+        return result
+    
+    def _next_page_scope(self, response) -> Optional[str]:
+        """
+        Pagination cursor of a calendar response.
+        
+        Args:
+            response: getCalendarFilteredData response
+        
+        Returns:
+            last_time_scope to request the next page with, or None if the range is exhausted
+        """
+        try:
+            json_response = response.json()
+        except Exception:
+            return None
+        # investing.com sets bind_scroll_handler while more rows remain past last_time_scope
+        if not json_response.get('bind_scroll_handler') or not json_response.get('rows_num'):
+            return None
+        scope = json_response.get('last_time_scope')
+        return str(scope) if scope else None
+    
+    def parse_calendar_response(self, response, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """
+        Parse an investing.com calendar response into US high-impact events.
+        
+        Args:
+            response: getCalendarFilteredData response
+            start_date: Start of the requested window
+            end_date: End of the requested window
+        
+        Returns:
+            List of event dictionaries
+        """
+        events = []
+        
+        # The AJAX endpoint returns JSON with HTML in the 'data' field
+        try:
+            json_response = response.json()
+            html_data = json_response.get('data', '')
+            if not html_data:
+                print("❌ No data in AJAX response")
+                return []
+        except Exception as e:
+            print(f"❌ Failed to parse JSON response: {e}")
+            # Fallback: try parsing as HTML directly
+            html_data = response.text
+        
+        # Extended lookback (48 hours before the window) so actual data is captured for
+        # completed events (some events release data hours after the scheduled time)
+        lookback_start = start_date - timedelta(hours=48)
+        
+        # Single pass over the rows; non-window, non-USD and non-high-impact rows are
+        # rejected from their attributes before any other cell is read
+        total, rows = parse_event_rows(html_data, lookback_start, end_date)
+        print(f"Found {total} total events")
+        
+        for row in rows:
+            # Impact: High (bull3) only (user requested to reduce clutter)
+            # Note: This may result in sparse calendar during quiet periods
+            impact = "High"
             
-            print(f"Fetching calendar data: {date_from} to {date_to}")
-            
-            response = self.scraper.post(url, headers=headers, data=data, timeout=30)
-            response.raise_for_status()
-            
-            # The AJAX endpoint returns JSON with HTML in the 'data' field
-            try:
-                json_response = response.json()
-                html_data = json_response.get('data', '')
-                if not html_data:
-                    print("❌ No data in AJAX response")
-                    return []
-            except Exception as e:
-                print(f"❌ Failed to parse JSON response: {e}")
-                # Fallback: try parsing as HTML directly
-                html_data = response.text
-            
-            soup = BeautifulSoup(html_data, 'lxml')
-            
-            # Parse event rows (tr.js-event-item excludes date header rows)
-            event_rows = soup.find_all('tr', {'class': 'js-event-item'})
+            # Determine status
+            status = "completed" if row["actual"] else "upcoming"
             
-            print(f"Found {len(event_rows)} total events")
+            # Debug logging for actual values
+            if row["actual"]:
+                print(f"  📊 Found actual value for {row['name']}: {row['actual']} (status: completed)")
             
-            for row in event_rows:
-                try:
-                    # Get datetime from data attribute (most reliable)
-                    event_datetime_str = row.get('data-event-datetime', '')
-                    if not event_datetime_str:
-                        continue
-                    
-                    # Parse datetime (format: YYYY/MM/DD HH:mm:ss)
-                    try:
-                        event_datetime = datetime.strptime(event_datetime_str, '%Y/%m/%d %H:%M:%S')
-                    except ValueError:
-                        print(f"⚠️  Could not parse datetime: {event_datetime_str}")
-                        continue
-                    
-                    # Filter: Events from 48 hours ago to +28 days
-                    # Extended lookback to ensure actual data is captured for completed events
-                    # (Some events release data hours after the scheduled time)
-                    lookback_start = start_date - timedelta(hours=48)
-                    if event_datetime < lookback_start or event_datetime > end_date:
-                        continue
-                    
-                    # Get currency/country
-                    currency_elem = row.find('td', {'class': 'flagCur'})
-                    if not currency_elem:
-                        continue
-                    
-                    currency = currency_elem.get_text(strip=True)
-                    
-                    # Filter: US events only (currency = USD)
-                    if currency != 'USD':
-                        continue
-                    
-                    # Get importance/impact
-                    impact_elem = row.find('td', {'class': 'sentiment'})
-                    if not impact_elem:
-                        continue
-                    
-                    # Check data-img_key attribute (bull1, bull2, bull3)
-                    img_key = impact_elem.get('data-img_key', '')
-                    
-                    # Filter: High (bull3) impact only (user requested to reduce clutter)
-                    # Note: This may result in sparse calendar during quiet periods
-                    if img_key != 'bull3':
-                        continue
-                    
-                    impact = "High"
-                    
-                    # Get event name
-                    name_elem = row.find('td', {'class': 'event'})
-                    name = name_elem.get_text(strip=True) if name_elem else "Unknown Event"
-                    
-                    # Clean up name (remove extra whitespace)
-                    name = ' '.join(name.split())
-                    
-                    # Get time (visible time text)
-                    time_elem = row.find('td', {'class': 'time'})
-                    event_time = time_elem.get_text(strip=True) if time_elem else event_datetime.strftime('%H:%M')
-                    
-                    # Get forecast value
-                    forecast_elem = row.find('td', {'class': 'fore'})
-                    forecast = forecast_elem.get_text(strip=True) if forecast_elem else None
-                    if forecast == '' or forecast == '\xa0':
-                        forecast = None
-                    
-                    # Get actual value
-                    actual_elem = row.find('td', {'class': 'act'})
-                    actual = actual_elem.get_text(strip=True) if actual_elem else None
-                    if actual == '' or actual == '\xa0':
-                        actual = None
-                    
-                    # Get previous value
-                    prev_elem = row.find('td', {'class': 'prev'})
-                    previous = prev_elem.get_text(strip=True) if prev_elem else None
-                    if previous == '' or previous == '\xa0':
-                        previous = None
-                    
-                    # Determine status
-                    status = "completed" if actual else "upcoming"
-                    
-                    # Debug logging for actual values
-                    if actual:
-                        print(f"  📊 Found actual value for {name}: {actual} (status: completed)")
-
-                    
-                    # Format date as YYYY-MM-DD
-                    event_date = event_datetime.strftime('%Y-%m-%d')
-                    
-                    event = {
-                        "id": self.generate_event_id(event_date, name),
-                        "date": event_date,
-                        "time": event_time,
-                        "name": name,
-                        "impact": impact,
-                        "forecast": forecast,
-                        "actual": actual,
-                        "previous": previous,
-                        "status": status,
-                        "notification_sent_12h": False,
-                        "notification_sent_release": False
-                    }
-                    
-                    events.append(event)
-                    
-                except Exception as e:
-                    print(f"⚠️  Failed to parse event row: {e}")
-                    continue
+            # Format date as YYYY-MM-DD
+            event_date = row["datetime"].strftime('%Y-%m-%d')
             
-            print(f"✅ Scraped {len(events)} US High/Medium impact events")
-            return events
+            event = {
+                "id": self.generate_event_id(event_date, row["name"]),
+                "date": event_date,
+                "time": row["time"],
+                "name": row["name"],
+                "impact": impact,
+                "forecast": row["forecast"],
+                "actual": row["actual"],
+                "previous": row["previous"],
+                "status": status,
+                "notification_sent_12h": False,
+                "notification_sent_release": False
+            }
             
-        except Exception as e:
-            print(f"❌ Failed to fetch calendar: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            events.append(event)
+        
+        return events
     
-    def merge_with_existing(self, new_events: List[Dict], old_data: Dict) -> List[Dict]:
+    def merge_with_existing(self, new_events: List[Dict], old_data: Dict,
+                            window: Optional[Tuple[datetime, datetime]] = None) -> List[Dict]:
         """
         Merge new events with existing data, preserving notification flags.
         
         Args:
             new_events: Newly scraped events
             old_data: Existing calendar data
+            window: Window the events were scraped for (None = the full window, whose
+                events replace the existing list). For a partial window, existing events
+                dated outside it are kept unless re-scraped; those inside are replaced.
             
         Returns:
             Merged event list
@@ -283,6 +460,17 @@ class EconomicCalendarFetcher:
             
             merged_events.append(new_event)
         
+        if window is not None:
+            # Keep existing events the partial scrape didn't cover (stable sort keeps each
+            # day's order; events within the window that disappeared are dropped)
+            first_date, last_date = (day.strftime('%Y-%m-%d') for day in window)
+            new_ids = {event['id'] for event in merged_events}
+            kept = [
+                event for event in old_data.get('events', [])
+                if event['id'] not in new_ids and not first_date <= event['date'] <= last_date
+            ]
+            merged_events = sorted(kept + merged_events, key=lambda event: event['date'])
+        
         return merged_events
     
     def check_and_send_notifications(self, events: List[Dict]) -> List[Dict]:
@@ -315,7 +503,7 @@ class EconomicCalendarFetcher:
                     event['impact'] == 'High'):  # Only High impact
                     message = self.format_warning_message(event, hours_until)
                     if self.send_telegram_notification(message):
-                        event['notification_sent_12h'] = True
+                        self.mark_notified(event, 'notification_sent_12h')
                         print(f"📢 Sent 12h warning for: {event['name']}")
                 
                 
@@ -326,7 +514,7 @@ class EconomicCalendarFetcher:
                     event['impact'] == 'High'):  # Only High impact
                     message = self.format_release_message(event)
                     if self.send_telegram_notification(message):
-                        event['notification_sent_release'] = True
+                        self.mark_notified(event, 'notification_sent_release')
                         print(f"📢 Sent release notification for: {event['name']}")
                 
                 updated_events.append(event)
@@ -337,6 +525,20 @@ class EconomicCalendarFetcher:
         
         return updated_events
     
+    def mark_notified(self, event: Dict, flag: str):
+        """
+        Set a notification flag on an event, persisting it right away (one-row update)
+        when the SQLite store is enabled.
+        
+        Args:
+            event: Event dictionary
+            flag: 'notification_sent_12h' or 'notification_sent_release'
+        """
+        event[flag] = True
+        self.flags_changed += 1
+        if self.store is not None:
+            self.store.set_event_flag(event['id'], flag)
+    
     def format_warning_message(self, event: Dict, hours_until: float) -> str:
         """Format 12-hour warning message."""
         impact_emoji = "🔴" if event['impact'] == "High" else "🟡"
@@ -395,7 +597,7 @@ class EconomicCalendarFetcher:
                 "parse_mode": "HTML"
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.http.post(url, json=payload)
             response.raise_for_status()
             return True
             
@@ -403,19 +605,66 @@ class EconomicCalendarFetcher:
             print(f"❌ Failed to send Telegram notification: {e}")
             return False
     
-    def save_calendar_data(self, events: List[Dict], filename: str = "calendar_data.json"):
-        """Save calendar data to JSON file."""
+    def save_calendar_data(self, events: List[Dict], filename: str = "calendar_data.json",
+                           full_refresh_at: Optional[str] = None) -> bool:
+        """
+        Save calendar data to JSON file (exported from the SQLite store when enabled).
+        
+        Args:
+            events: Events to save
+            filename: Output filename
+            full_refresh_at: Time of the last full-window scrape (ISO UTC)
+        
+        Returns:
+            True if saved
+        """
         output = {
             "updated_at": datetime.utcnow().isoformat() + "Z",
+            "full_refresh_at": full_refresh_at,
             "events": events
         }
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(output, f, indent=2)
+            if self.store is not None and events:
+                # The merged list is the whole calendar from its first date on: stored events
+                # from that date it no longer has (dropped or renamed upstream) are deleted
+                dates = [event['date'] for event in events]
+                self.store.upsert_events(events, prune_from=min(dates))
+                self.store.set_meta('calendar_updated_at', output["updated_at"])
+                self.store.set_meta('calendar_full_refresh_at', full_refresh_at or '')
+                self.store.export_calendar(min(dates), max(dates), filename)
+            else:
+                write_json(output, filename)
             print(f"✅ Calendar data saved to: {filename}")
+            return True
         except Exception as e:
             print(f"❌ Failed to save calendar data: {e}")
+            return False
+    
+    def save_shards(self, events: List[Dict], directory: str = CALENDAR_SHARD_DIR):
+        """
+        Save one content-addressed shard per calendar week (Monday to Sunday) plus a manifest,
+        so clients only download the weeks whose events changed.
+        
+        Args:
+            events: Events to save
+            directory: Shard directory
+        """
+        weeks = {}
+        for event in events:
+            day = datetime.strptime(event['date'], '%Y-%m-%d')
+            week_start = (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+            weeks.setdefault(week_start, []).append(event)
+        
+        shards = {
+            f"week-{week_start}": {"week_start": week_start, "events": weeks[week_start]}
+            for week_start in sorted(weeks)
+        }
+        try:
+            manifest = write_shards(directory, shards)
+            print(f"✅ Calendar shards saved to: {directory}/ (updated {manifest['updated_at']})")
+        except Exception as e:
+            print(f"❌ Failed to save calendar shards: {e}")
 
 
 def main():
@@ -435,21 +684,52 @@ def main():
     # Load existing data
     old_data = fetcher.load_existing_data()
     
-    # Fetch new events
-    new_events = fetcher.fetch_calendar_events()
+    # Fetch new events: the full window a few times a day, otherwise only the hot window
+    full_refresh = fetcher.needs_full_refresh(old_data)
+    if full_refresh:
+        window = None
+        new_events = fetcher.fetch_calendar_events()
+    else:
+        window = fetcher.hot_window()
+        print(f"♨️  Hot window refresh (full refresh every {FULL_REFRESH_HOURS}h)")
+        new_events = fetcher.fetch_calendar_events(*window)
     
-    if not new_events:
+    # An empty full window means the scrape broke; a quiet hot window is normal
+    if new_events is None or (full_refresh and not new_events):
         print("⚠️  No events fetched. Using existing data.")
         return
     
+    # Nothing changed upstream: skip merging and saving, but time-based notifications
+    # (12h warnings) still go out, and their flags are saved if any were set
+    if fetcher.unchanged and old_data.get('events'):
+        print("♻️  Calendar responses unchanged - reusing existing events")
+        updated_events = fetcher.check_and_send_notifications(old_data['events'])
+        saved = True
+        if fetcher.flags_changed:
+            saved = fetcher.save_calendar_data(updated_events, full_refresh_at=old_data.get('full_refresh_at'))
+            fetcher.save_shards(updated_events)
+        if saved:
+            fetcher.save_page_state(full_refresh)
+        print(f"\n📊 Summary: {len(updated_events)} events tracked")
+        return
+    
     # Merge with existing data
-    merged_events = fetcher.merge_with_existing(new_events, old_data)
+    merged_events = fetcher.merge_with_existing(new_events, old_data, window)
     
     # Check and send notifications
     updated_events = fetcher.check_and_send_notifications(merged_events)
     
     # Save updated data
-    fetcher.save_calendar_data(updated_events)
+    full_refresh_at = datetime.utcnow().isoformat() + "Z" if full_refresh else old_data.get('full_refresh_at')
+    saved = fetcher.save_calendar_data(updated_events, full_refresh_at=full_refresh_at)
+    
+    # Per-week shards (files of unchanged weeks are left as they are)
+    fetcher.save_shards(updated_events)
+    
+    # Page hashes only once the data is saved: otherwise the next run would see unchanged
+    # pages and skip re-parsing events that never made it to disk
+    if saved:
+        fetcher.save_page_state(full_refresh)
     
     print(f"\n📊 Summary: {len(updated_events)} events tracked")
 
@@ -5,411 +5,426 @@ Fetches 6 key financial/crypto metrics from multiple data sources.
 """
 
 import json
-import requests
+import math
+import threading
 import time
-from datetime import datetime
-from typing import Dict, Any, Optional
-import yfinance as yf
-from fredapi import Fred
-from tabulate import tabulate
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable
+import requests
+from change_detection import evaluate_thresholds
+from coingecko import CoinGeckoClient
+from fred_client import FredClient, get_fred_client
+from history_retention import TieredHistory
+from http_client import get_http_client
+from json_stream import iter_json_array
+from metric_history import MetricHistory
+from metric_registry import MessageLine, MetricEngine, MetricOutcome, MetricSpec, Request, Source
+from output_writer import write_json, write_shards
+from resilience import get_circuit_breaker
+from response_cache import get_response_cache
+from rolling_stats import HORIZONS, RollingStats
+from sqlite_store import get_sqlite_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Upstream hosts with their own circuit breaker
+COINGECKO_HOST = "api.coingecko.com"
+FRED_HOST = "api.stlouisfed.org"
+STABLECOINS_HOST = "stablecoins.llama.fi"
+LLAMA_HOST = "api.llama.fi"
+
+# Per-metric shards for the frontend (see output_writer.write_shards)
+METRIC_SHARD_DIR = "shards/metrics"
+
+# DefiLlama protocol categories counted as RWA
+RWA_CATEGORIES = ["RWA", "RWA Lending", "Private Credit", "Real World Assets"]
+
+
+def _fred_configured(fetcher: 'MetricsFetcher') -> bool:
+    """Whether a FRED API key is set."""
+    return fetcher.fred_api_key != "YOUR_FRED_API_KEY"
+
+
+def _nonzero(value: float, message: str) -> float:
+    """Return value, raising ValueError(message) if it is zero."""
+    if value == 0:
+        raise ValueError(message)
+    return value
+
+
+def _sum_circulating(response: requests.Response) -> float:
+    """Sum circulating USD over all stablecoins in a DefiLlama /stablecoins response."""
+    total = 0
+    for coin in response.json().get('peggedAssets', []):
+        circulating = coin.get('circulating', {}).get('peggedUSD', 0)
+        if circulating:
+            total += float(circulating)
+    return total
+
+
+def _sum_rwa_tvl(response: requests.Response) -> List[float]:
+    """Sum TVL over RWA protocols in a DefiLlama /protocols response; returns [total, count]."""
+    total = 0
+    count = 0
+    
+    # Parse the (large) payload as it arrives, keeping only category and tvl per protocol
+    protocols = iter_json_array(response.iter_content(chunk_size=65536), keys=('category', 'tvl'))
+    
+    for protocol in protocols:
+        # Check if protocol is in target categories
+        if protocol.get('category') in RWA_CATEGORIES:
+            tvl = protocol.get('tvl', 0)
+            if tvl:
+                total += float(tvl)
+                count += 1
+    return [total, count]
+
+
+def _yield_values(dgs10: 'pd.Series') -> Dict[str, float]:
+    """10Y yield and its change from ~7 business days (observations) ago."""
+    # Current value (most recent)
+    value = float(dgs10.iloc[-1])
+    
+    values = {"us_10y_yield": value}
+    
+    # Calculate 7-day change
+    if len(dgs10) >= 7:
+        # Get value from ~7 business days ago
+        old_value = float(dgs10.iloc[-7])
+        values["us_10y_yield_7d_change"] = ((value - old_value) / old_value) * 100
+    return values
+
+
+def _net_liquidity_values(walcl_series: 'pd.Series', tga_series: 'pd.Series',
+                          rrp_series: 'pd.Series') -> Dict[str, float]:
+    """Net liquidity (WALCL - TGA - RRP) and its change from 7 calendar days ago."""
+    # Calculate current net liquidity (in billions)
+    net_liquidity = float(walcl_series.iloc[-1] - tga_series.iloc[-1] - rrp_series.iloc[-1])
+    values = {"fed_net_liquidity": net_liquidity}
+    
+    # Calculate 7-day change: each series as of 7 calendar days ago (weekly and daily
+    # series have different observation counts per week, so index offsets don't line up)
+    week_ago = datetime.now() - timedelta(days=7)
+    old_values = [s.asof(week_ago) for s in (walcl_series, tga_series, rrp_series)]
+    if not any(math.isnan(v) for v in old_values):  # asof gives NaN when there is no earlier value
+        old_walcl, old_tga, old_rrp = old_values
+        old_net_liquidity = float(old_walcl - old_tga - old_rrp)
+        values["fed_net_liquidity_7d_change"] = ((net_liquidity - old_net_liquidity) / old_net_liquidity) * 100
+    return values
+
+
+def _fred_request(series_id: str, days: int) -> Request:
+    """Request syncing a FRED series and returning its last `days` days of observations."""
+    return Request(FRED_HOST, lambda f: f.fred.get_series(series_id, datetime.now() - timedelta(days=days)))
+
+
+# Upstream requests, shared by every source that names them (each runs at most once per run).
+# FRED windows come from the local observation store; only new observations are downloaded.
+REQUESTS = {
+    'fred_dgs10': _fred_request('DGS10', 14),        # At least 7 business days
+    'fred_walcl': _fred_request('WALCL', 21),        # Weekly: enough for a value 7 days back
+    'fred_wtregen': _fred_request('WTREGEN', 21),
+    'fred_rrpontsyd': _fred_request('RRPONTSYD', 21),
+    'yfinance_tnx': Request(None, lambda f: f._yfinance_close("^TNX")),
+    'yfinance_btc': Request(None, lambda f: f._yfinance_close("BTC-USD")),
+    'coingecko_markets': Request(COINGECKO_HOST, lambda f: f.coingecko.markets()),
+    'coingecko_global': Request(COINGECKO_HOST, lambda f: f.coingecko.global_market()),
+    'defillama_stablecoins': Request(STABLECOINS_HOST, lambda f: f._cached_get(
+        f"https://{STABLECOINS_HOST}/stablecoins?includePrices=true", _sum_circulating)),
+    'defillama_protocols': Request(LLAMA_HOST, lambda f: f._cached_get(
+        f"https://{LLAMA_HOST}/protocols", _sum_rwa_tvl, timeout=15, stream=True))
+}
+
+# The tracked metrics, in report / notification order. Adding a metric means adding a spec
+# here (and any new request above); thresholds, change detection, history columns, the
+# report and the Telegram message all follow from this list.
+METRICS = [
+    MetricSpec(
+        "us_10y_yield", "US 10Y Bond Yield",
+        sources=[
+            Source(['fred_dgs10'], _yield_values, "FRED API (DGS10)", enabled=_fred_configured),
+            Source(['yfinance_tnx'], float, "yfinance (^TNX)")
+        ],
+        threshold=0.0,                  # 0.0 = any change triggers alert
+        absolute_threshold=True,        # Absolute change (e.g. 4.15% -> 4.20% = 0.05)
+        formatter=lambda v: f"{v:.2f}%",
+        source_name="FRED/yfinance",
+        attempts=2,
+        message=MessageLine("Macro (The Ceiling)", "🏛️", "US 10Y", lambda v: f"{v:.2f}", suffix="%")
+    ),
+    MetricSpec(
+        "fed_net_liquidity", "Fed Net Liquidity",
+        sources=[
+            Source(['fred_walcl', 'fred_wtregen', 'fred_rrpontsyd'], _net_liquidity_values, "FRED API",
+                   enabled=_fred_configured, disabled_reason="FRED API key not configured")
+        ],
+        threshold=0.0,                  # 0.0 = any change triggers alert
+        formatter=lambda v: f"${v:,.0f}B",
+        source_name="FRED API",
+        message=MessageLine("Macro (The Ceiling)", "💧", "Liquidity", lambda v: f"{v:,.0f}B", prefix="$")
+    ),
+    MetricSpec(
+        "bitcoin_price", "Bitcoin Price",
+        sources=[
+            Source(['coingecko_markets'], lambda markets: markets['bitcoin']['current_price'], "CoinGecko API"),
+            Source(['yfinance_btc'], float, "yfinance (BTC-USD)")
+        ],
+        threshold=0.5,                  # 0.5% change
+        formatter=lambda v: f"${v:,.2f}",
+        source_name="CoinGecko/yfinance",
+        attempts=2,
+        message=MessageLine("Market (The Floor)", "₿", "BTC", lambda v: f"{v:,.0f}", prefix="$")
+    ),
+    MetricSpec(
+        "stablecoin_mcap", "Stablecoin Market Cap",
+        sources=[
+            Source(['defillama_stablecoins'], lambda total: _nonzero(total, "No stablecoin data found"),
+                   "DefiLlama API")
+        ],
+        threshold=0.1,                  # 0.1% change
+        formatter=lambda v: f"${v:,.0f}",
+        source_name="DefiLlama API",
+        message=MessageLine("Market (The Floor)", "🌊", "Stablecoins", lambda v: f"{v/1e9:.1f}B", prefix="$")
+    ),
+    MetricSpec(
+        "usdt_dominance", "USDT Dominance",
+        sources=[
+            # USDT market cap / total crypto market cap * 100
+            Source(['coingecko_markets', 'coingecko_global'],
+                   lambda markets, global_market: (markets['tether']['market_cap']
+                                                   / global_market['total_market_cap_usd']) * 100,
+                   "CoinGecko API")
+        ],
+        threshold=0.5,                  # 0.5% change
+        formatter=lambda v: f"{v:.2f}%",
+        source_name="CoinGecko API",
+        message=MessageLine("Alpha Signals", "😨", "USDT Dom", lambda v: f"{v:.2f}", suffix="%")
+    ),
+    MetricSpec(
+        "rwa_tvl", "Total RWA TVL",
+        sources=[
+            Source(['defillama_protocols'],
+                   lambda protocols: _nonzero(protocols[0], "No RWA protocols found or total TVL is zero"),
+                   lambda protocols: f"DefiLlama API ({protocols[1]} protocols)")
+        ],
+        threshold=1.0,                  # 1.0% change
+        formatter=lambda v: f"${v:,.0f}",
+        source_name="DefiLlama API",
+        message=MessageLine("Alpha Signals", "🏦", "RWA TVL", lambda v: f"{v/1e9:.2f}B", prefix="$")
+    )
+]
 
 
 class MetricsFetcher:
     """Fetches and processes financial metrics from various sources."""
     
+    # Metric registry (see METRICS)
+    METRICS = METRICS
+    
     # Notification thresholds for each metric
-    NOTIFICATION_THRESHOLDS = {
-        'bitcoin_price': 0.5,           # 0.5% change
-        'us_10y_yield': 0.0,            # 0.0 = any change triggers alert
-        'fed_net_liquidity': 0.0,       # 0.0 = any change triggers alert
-        'stablecoin_mcap': 0.1,         # 0.1% change
-        'usdt_dominance': 0.5,          # 0.5% change
-        'rwa_tvl': 1.0                  # 1.0% change
-    }
-    
-    def __init__(self, fred_api_key: str = "YOUR_FRED_API_KEY"):
+    NOTIFICATION_THRESHOLDS = {spec.key: spec.threshold for spec in METRICS}
+    
+    # The tracked metrics (change detection and history columns)
+    TRACKED_METRICS = [spec.key for spec in METRICS]
+    
+    # Metrics that use absolute threshold instead of percentage
+    ABSOLUTE_THRESHOLD_METRICS = [spec.key for spec in METRICS if spec.absolute_threshold]
+    
+    def __init__(self, fred_api_key: str = "YOUR_FRED_API_KEY", concurrent: bool = True,
+                 hedge_delay: Optional[float] = 1.0, hedge_timeout: Optional[float] = 4.0):
         """
         Initialize the metrics fetcher.
         
         Args:
             fred_api_key: API key for FRED (Federal Reserve Economic Data)
+            concurrent: Run all fetchers at once in a thread pool instead of one after another
+            hedge_delay: Seconds to wait for a primary source before also firing its fallback
+                (None = only fall back after the primary fails)
+            hedge_timeout: Request timeout cap for metrics with a fallback (None = HTTP_TIMEOUT)
         """
         self.fred_api_key = fred_api_key
+        self.concurrent = concurrent
+        self.hedge_delay = hedge_delay
         self.results = []
         self.data = {}
         self.metric_changes = {}  # Store percentage changes for notifications
+        self.diagnostics = {}  # Per-metric timing / outcome, written to the output's diagnostics section
+        self._lock = threading.Lock()  # Guards self.results/self.data across fetcher threads
         
-        # Create a custom session for yfinance with User-Agent headers
-        self.yf_session = requests.Session()
-        self.yf_session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        })
+        # Shared pooled keep-alive client (also carries the User-Agent yfinance needs)
+        self.http = get_http_client()
+        self.yf_session = self.http.session
+        self.response_cache = get_response_cache()
         
-    def fetch_us_10y_yield(self) -> Optional[float]:
-        """
-        Fetch US 10-Year Treasury Bond Yield.
-        Primary: FRED API (DGS10)
-        Fallback: yfinance with custom session
+        # CoinGecko market data, shared by BTC price and USDT dominance through the engine
+        self.coingecko = CoinGeckoClient(self.http, self.response_cache)
         
-        Returns:
-            Current yield value or None if fetch fails
-        """
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                # Method 1 (Primary): Try FRED API first
-                if self.fred_api_key != "YOUR_FRED_API_KEY":
-                    try:
-                        from datetime import datetime, timedelta
-                        fred = Fred(api_key=self.fred_api_key)
-                        
-                        # Get last 14 days of data to ensure we have 7 business days
-                        end_date = datetime.now()
-                        start_date = end_date - timedelta(days=14)
-                        
-                        dgs10 = fred.get_series('DGS10', start_date=start_date, end_date=end_date)
-                        
-                        # Current value (most recent)
-                        value = float(dgs10.iloc[-1])
-                        
-                        # Calculate 7-day change
-                        seven_day_change = None
-                        if len(dgs10) >= 7:
-                            # Get value from ~7 business days ago
-                            old_value = float(dgs10.iloc[-7])
-                            seven_day_change = ((value - old_value) / old_value) * 100
-                        
-                        self.results.append({
-                            "Metric": "US 10Y Bond Yield",
-                            "Value": f"{value:.2f}%",
-                            "Source": "FRED API (DGS10)",
-                            "Status": "✓ Success"
-                        })
-                        self.data["us_10y_yield"] = value
-                        if seven_day_change is not None:
-                            self.data["us_10y_yield_7d_change"] = seven_day_change
-                        return value
-                    except Exception:
-                        pass  # If FRED fails, try yfinance
-                
-                # Method 2 (Fallback): Try yfinance with custom session
-                try:
-                    ticker = yf.Ticker("^TNX", session=self.yf_session)
-                    hist = ticker.history(period="5d")
-                    
-                    if not hist.empty:
-                        value = float(hist['Close'].iloc[-1])
-                        self.results.append({
-                            "Metric": "US 10Y Bond Yield",
-                            "Value": f"{value:.2f}%",
-                            "Source": "yfinance (^TNX)",
-                            "Status": "✓ Success"
-                        })
-                        self.data["us_10y_yield"] = value
-                        return value
-                except Exception:
-                    pass  # Both failed
-                
-                raise ValueError("Both FRED and yfinance failed")
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(2)  # Wait 2 seconds before retry
-                    continue
-                else:
-                    self.results.append({
-                        "Metric": "US 10Y Bond Yield",
-                        "Value": "N/A",
-                        "Source": "FRED/yfinance",
-                        "Status": f"✗ Failed: {str(e)[:30]}"
-                    })
-                    self.data["us_10y_yield"] = None
-                    return None
-    
-    def fetch_bitcoin_price(self) -> Optional[float]:
-        """
-        Fetch current Bitcoin price.
-        Primary: CoinGecko API
-        Fallback: yfinance with custom session
+        # Per-host circuit breakers (state persists between runs) and the previous run's
+        # output, served as last-known values while an upstream's circuit is open
+        self.breaker = get_circuit_breaker()
+        self.previous_data = None
         
-        Returns:
-            Current BTC price in USD or None if fetch fails
-        """
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                # Method 1 (Primary): Try CoinGecko first
-                try:
-                    btc_url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-                    response = requests.get(btc_url, timeout=10)
-                    response.raise_for_status()
-                    btc_data = response.json()
-                    value = float(btc_data['bitcoin']['usd'])
-                    self.results.append({
-                        "Metric": "Bitcoin Price",
-                        "Value": f"${value:,.2f}",
-                        "Source": "CoinGecko API",
-                        "Status": "✓ Success"
-                    })
-                    self.data["bitcoin_price"] = value
-                    return value
-                except Exception:
-                    pass  # If CoinGecko fails, try yfinance
-                
-                # Method 2 (Fallback): Try yfinance with custom session
-                try:
-                    ticker = yf.Ticker("BTC-USD", session=self.yf_session)
-                    hist = ticker.history(period="5d")
-                    
-                    if not hist.empty:
-                        value = float(hist['Close'].iloc[-1])
-                        self.results.append({
-                            "Metric": "Bitcoin Price",
-                            "Value": f"${value:,.2f}",
-                            "Source": "yfinance (BTC-USD)",
-                            "Status": "✓ Success"
-                        })
-                        self.data["bitcoin_price"] = value
-                        return value
-                except Exception:
-                    pass  # Both failed
-                
-                raise ValueError("Both CoinGecko and yfinance failed")
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(2)  # Wait 2 seconds before retry
-                    continue
-                else:
-                    self.results.append({
-                        "Metric": "Bitcoin Price",
-                        "Value": "N/A",
-                        "Source": "CoinGecko/yfinance",
-                        "Status": f"✗ Failed: {str(e)[:30]}"
-                    })
-                    self.data["bitcoin_price"] = None
-                    return None
-    
-    def fetch_stablecoin_mcap(self) -> Optional[float]:
+        # Runs the registry's requests (each shared request once per run) and sources
+        self.engine = MetricEngine(self, REQUESTS, self.breaker, hedge_delay, hedge_timeout)
+        
+        # Optional SQLite storage (COCKPIT_DB); dashboard_data.json is then exported from it
+        self.store = get_sqlite_store()
+    
+    @property
+    def fred(self) -> FredClient:
+        """Shared FRED client (one per process, with a per-series observation cache)."""
+        return get_fred_client(self.fred_api_key)
+    
+    def _cached_get(self, url: str, parse: Callable[[requests.Response], Any], **kwargs) -> Any:
         """
-        Fetch total Stablecoin Market Cap from DefiLlama.
+        GET a URL through the persistent conditional-request cache.
+        
+        Args:
+            url: Request URL
+            parse: Turns the response into a JSON-serializable result (skipped on 304 or within TTL)
+            **kwargs: Passed through to the HTTP client
         
         Returns:
-            Total stablecoin market cap or None if fetch fails
+            Parsed result
         """
-        try:
-            url = "https://stablecoins.llama.fi/stablecoins?includePrices=true"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Sum circulating USD for all stablecoins
-            total_mcap = 0
-            for coin in data.get('peggedAssets', []):
-                circulating = coin.get('circulating', {}).get('peggedUSD', 0)
-                if circulating:
-                    total_mcap += float(circulating)
-            
-            if total_mcap == 0:
-                raise ValueError("No stablecoin data found")
-                
-            value = total_mcap
-            self.results.append({
-                "Metric": "Stablecoin Market Cap",
-                "Value": f"${value:,.0f}",
-                "Source": "DefiLlama API",
-                "Status": "✓ Success"
-            })
-            self.data["stablecoin_mcap"] = value
-            return value
-            
-        except Exception as e:
-            self.results.append({
-                "Metric": "Stablecoin Market Cap",
-                "Value": "N/A",
-                "Source": "DefiLlama API",
-                "Status": f"✗ Failed: {str(e)[:30]}"
-            })
-            self.data["stablecoin_mcap"] = None
-            return None
+        return self.response_cache.fetch(
+            url,
+            lambda headers: self.http.get(url, headers=headers, **kwargs),
+            parse
+        )
     
-    def fetch_rwa_tvl(self) -> Optional[float]:
+    def _yfinance_close(self, symbol: str) -> float:
         """
-        Fetch Total RWA (Real World Assets) TVL from DefiLlama.
+        Latest close from yfinance (fallback source for market data).
+        
+        Args:
+            symbol: Yahoo Finance ticker (e.g. ^TNX, BTC-USD)
         
         Returns:
-            Total RWA TVL or None if fetch fails
+            Most recent closing value
         """
-        try:
-            # Fetch all protocols from DefiLlama
-            url = "https://api.llama.fi/protocols"
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            
-            protocols = response.json()
-            
-            # Filter protocols by RWA category and sum their TVL
-            target_categories = ["RWA", "RWA Lending", "Private Credit", "Real World Assets"]
-            total_rwa_tvl = 0
-            rwa_count = 0
-            
-            for protocol in protocols:
-                # Check if protocol is in target categories
-                if protocol.get('category') in target_categories:
-                    tvl = protocol.get('tvl', 0)
-                    if tvl:
-                        total_rwa_tvl += float(tvl)
-                        rwa_count += 1
-            
-            if total_rwa_tvl == 0:
-                raise ValueError("No RWA protocols found or total TVL is zero")
-            
-            value = total_rwa_tvl
-            self.results.append({
-                "Metric": "Total RWA TVL",
-                "Value": f"${value:,.0f}",
-                "Source": f"DefiLlama API ({rwa_count} protocols)",
-                "Status": "✓ Success"
-            })
-            self.data["rwa_tvl"] = value
-            return value
-            
-        except Exception as e:
-            self.results.append({
-                "Metric": "Total RWA TVL",
-                "Value": "N/A",
-                "Source": "DefiLlama API",
-                "Status": f"✗ Failed: {str(e)[:30]}"
-            })
-            self.data["rwa_tvl"] = None
-            return None
+        import yfinance as yf  # Heavy (pulls in pandas); only imported when the fallback actually runs
+        
+        ticker = yf.Ticker(symbol, session=self.yf_session)
+        hist = ticker.history(period="5d")
+        if hist.empty:
+            raise ValueError(f"No yfinance data for {symbol}")
+        return float(hist['Close'].iloc[-1])
     
-    def fetch_usdt_dominance(self) -> Optional[float]:
+    def _record(self, spec: MetricSpec, outcome: MetricOutcome, duration_ms: float):
         """
-        Fetch USDT Dominance (USDT Market Cap / Total Crypto Market Cap * 100).
-        Uses CoinGecko API for market cap data.
+        Record a metric's report row, values and diagnostics (thread-safe).
         
-        Returns:
-            USDT dominance percentage or None if fetch fails
+        Args:
+            spec: Metric that was fetched
+            outcome: Engine outcome
+            duration_ms: Wall time of the fetch
         """
-        try:
-            # Fetch USDT market cap
-            usdt_url = "https://api.coingecko.com/api/v3/coins/tether"
-            response = requests.get(usdt_url, timeout=10)
-            response.raise_for_status()
-            usdt_data = response.json()
-            usdt_mcap = float(usdt_data['market_data']['market_cap']['usd'])
-            
-            # Fetch global crypto market cap
-            global_url = "https://api.coingecko.com/api/v3/global"
-            response = requests.get(global_url, timeout=10)
-            response.raise_for_status()
-            global_data = response.json()
-            total_mcap = float(global_data['data']['total_market_cap']['usd'])
-            
-            # Calculate dominance
-            dominance = (usdt_mcap / total_mcap) * 100
-            
-            self.results.append({
-                "Metric": "USDT Dominance",
-                "Value": f"{dominance:.2f}%",
-                "Source": "CoinGecko API",
-                "Status": "✓ Success"
-            })
-            self.data["usdt_dominance"] = dominance
-            return dominance
-            
-        except Exception as e:
-            self.results.append({
-                "Metric": "USDT Dominance",
+        value = outcome.values.get(spec.key)
+        if outcome.source is None:
+            row = {
+                "Metric": spec.name,
                 "Value": "N/A",
-                "Source": "CoinGecko API",
-                "Status": f"✗ Failed: {str(e)[:30]}"
-            })
-            self.data["usdt_dominance"] = None
-            return None
+                "Source": outcome.label,
+                "Status": f"✗ Failed: {str(outcome.error)[:30]}"
+            }
+        else:
+            row = {
+                "Metric": spec.name,
+                "Value": spec.formatter(value),
+                "Source": outcome.label,
+                "Status": "✓ Last known" if outcome.source == 'last_known' else "✓ Success"
+            }
+        
+        # HTTP responses of the requests this metric used (shared requests appear under each user)
+        responses = [
+            response
+            for key in outcome.requests
+            for response in self.engine.request_stats.get(key, {}).get("responses", [])
+        ]
+        sizes = [r["bytes"] for r in responses if r["bytes"] is not None]
+        
+        with self._lock:
+            self.results.append(row)
+            self.data.update(outcome.values)
+            self.diagnostics[spec.key] = {
+                "ok": outcome.source is not None,
+                "attempts": outcome.attempts,
+                "source": outcome.source,
+                "duration_ms": duration_ms,
+                "upstream": outcome.requests,
+                "http_requests": len(responses),
+                "http_status": responses[-1]["status"] if responses else None,
+                "bytes_received": sum(sizes) if sizes else None,
+                "requests": responses
+            }
     
-    def fetch_fed_net_liquidity(self) -> Optional[float]:
+    def _sort_results(self):
+        """Put report rows and metric values into registry order."""
+        names = [spec.name for spec in self.METRICS]
+        keys = [spec.key for spec in self.METRICS]
+        
+        def data_rank(key: str) -> int:
+            # Derived values (e.g. us_10y_yield_7d_change) sort with their base metric
+            for i, metric in enumerate(keys):
+                if key == metric or key.startswith(metric + "_"):
+                    return i
+            return len(keys)
+        
+        with self._lock:
+            self.results.sort(key=lambda r: names.index(r["Metric"]) if r["Metric"] in names else len(names))
+            self.data = {k: self.data[k] for k in sorted(self.data, key=data_rank)}
+    
+    def fetch_metric(self, spec: MetricSpec) -> Optional[float]:
         """
-        Fetch Fed Net Liquidity.
-        Formula: WALCL (Total Assets) - TGA (Treasury General Account) - RRP (Reverse Repo)
+        Fetch one registered metric and record its report row and diagnostics.
+        Sources are tried in priority order (hedged, with retries per spec.attempts); while
+        every usable source's circuit is open, the last known value is served.
+        
+        Args:
+            spec: Metric to fetch
         
         Returns:
-            Net liquidity value or None if fetch fails
+            Metric value or None if the fetch failed
         """
-        try:
-            if self.fred_api_key == "YOUR_FRED_API_KEY":
-                raise ValueError("FRED API key not configured")
-                
-            from datetime import datetime, timedelta
-            fred = Fred(api_key=self.fred_api_key)
-            
-            # Get last 14 days of data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=14)
-            
-            # Fetch the latest values for each series
-            walcl_series = fred.get_series('WALCL', start_date=start_date, end_date=end_date)
-            tga_series = fred.get_series('WTREGEN', start_date=start_date, end_date=end_date)
-            rrp_series = fred.get_series('RRPONTSYD', start_date=start_date, end_date=end_date)
-            
-            # Current values
-            walcl = walcl_series.iloc[-1]
-            tga = tga_series.iloc[-1]
-            rrp = rrp_series.iloc[-1]
-            
-            # Calculate current net liquidity (in billions)
-            net_liquidity = float(walcl - tga - rrp)
-            
-            # Calculate 7-day change
-            seven_day_change = None
-            if len(walcl_series) >= 7 and len(tga_series) >= 7 and len(rrp_series) >= 7:
-                old_walcl = walcl_series.iloc[-7]
-                old_tga = tga_series.iloc[-7]
-                old_rrp = rrp_series.iloc[-7]
-                old_net_liquidity = float(old_walcl - old_tga - old_rrp)
-                seven_day_change = ((net_liquidity - old_net_liquidity) / old_net_liquidity) * 100
-            
-            self.results.append({
-                "Metric": "Fed Net Liquidity",
-                "Value": f"${net_liquidity:,.0f}B",
-                "Source": "FRED API",
-                "Status": "✓ Success"
-            })
-            self.data["fed_net_liquidity"] = net_liquidity
-            if seven_day_change is not None:
-                self.data["fed_net_liquidity_7d_change"] = seven_day_change
-            return net_liquidity
-            
-        except Exception as e:
-            self.results.append({
-                "Metric": "Fed Net Liquidity",
-                "Value": "N/A",
-                "Source": "FRED API",
-                "Status": f"✗ Failed: {str(e)[:30]}"
-            })
-            self.data["fed_net_liquidity"] = None
-            return None
+        previous = (self.previous_data or {}).get('metrics', {})
+        start = time.perf_counter()
+        outcome = self.engine.run(spec, previous)
+        self._record(spec, outcome, round((time.perf_counter() - start) * 1000, 1))
+        return outcome.values.get(spec.key)
     
     def fetch_all_metrics(self) -> Dict[str, Any]:
         """
-        Fetch all 6 metrics and compile results.
+        Fetch all registered metrics and compile results.
         
         Returns:
             Dictionary containing all metrics and metadata
         """
         print("🔄 Fetching Macro & Web3 Metrics...\n")
         
-        # Fetch all metrics
-        self.fetch_us_10y_yield()
-        self.fetch_bitcoin_price()
-        self.fetch_stablecoin_mcap()
-        self.fetch_rwa_tvl()
-        self.fetch_usdt_dominance()
-        self.fetch_fed_net_liquidity()
+        run_start = time.perf_counter()
+        if self.concurrent:
+            # Start every distinct upstream request at once, then evaluate the metrics as
+            # their requests complete (run time is bounded by the slowest source)
+            self.engine.plan(self.METRICS)
+            with ThreadPoolExecutor(max_workers=len(self.METRICS)) as executor:
+                futures = [executor.submit(self.fetch_metric, spec) for spec in self.METRICS]
+                for future in futures:
+                    future.result()
+        else:
+            for spec in self.METRICS:
+                self.fetch_metric(spec)
+        run_duration_ms = round((time.perf_counter() - run_start) * 1000, 1)
+        
+        # Threads finish in any order; keep the report and JSON output stable
+        self._sort_results()
         
         # Print results table
+        from tabulate import tabulate  # Deferred: only needed for the console report
+        
         print("\n" + "="*80)
         print("📊 MACRO & WEB3 STRATEGIC DASHBOARD - METRICS REPORT")
         print("="*80 + "\n")
@@ -425,6 +440,10 @@ class MetricsFetcher:
                 "total_metrics": len(self.results),
                 "successful": len([r for r in self.results if "✓" in r["Status"]]),
                 "failed": len([r for r in self.results if "✗" in r["Status"]])
+            },
+            "diagnostics": {
+                "run_duration_ms": run_duration_ms,
+                "fetches": {spec.key: self.diagnostics.get(spec.key, {}) for spec in self.METRICS}
             }
         }
         
@@ -432,22 +451,102 @@ class MetricsFetcher:
     
     def save_to_json(self, output: Dict[str, Any], filename: str = "dashboard_data.json"):
         """
-        Save metrics data to JSON file.
+        Save metrics data to JSON file (exported from the SQLite store when enabled).
         
         Args:
             output: Data dictionary to save
             filename: Output filename
         """
         try:
-            with open(filename, 'w') as f:
-                json.dump(output, f, indent=2)
+            if self.store is not None:
+                self.store.save_metrics_run(output, self._measured_metrics(output))
+                self.store.export_dashboard(filename)
+            else:
+                write_json(output, filename)
             print(f"✅ Data saved to: {filename}")
         except Exception as e:
             print(f"❌ Failed to save JSON: {e}")
     
+    def save_shards(self, output: Dict[str, Any], directory: str = METRIC_SHARD_DIR):
+        """
+        Save one content-addressed shard per metric (its value and derived values such as
+        the 7d change) plus a manifest, so clients only download the metrics that changed.
+        
+        Args:
+            output: Data dictionary from fetch_all_metrics
+            directory: Shard directory
+        """
+        metrics = output.get('metrics', {})
+        shards = {
+            spec.key: {
+                "metric": spec.key,
+                "values": {k: v for k, v in metrics.items() if k == spec.key or k.startswith(spec.key + "_")}
+            }
+            for spec in self.METRICS
+        }
+        try:
+            manifest = write_shards(directory, shards)
+            print(f"✅ Metric shards saved to: {directory}/ (updated {manifest['updated_at']})")
+        except Exception as e:
+            print(f"❌ Failed to save metric shards: {e}")
+    
+    @staticmethod
+    def _measured_metrics(output: Dict[str, Any]) -> Dict[str, Any]:
+        """This run's metric values without the last known values served for open circuits."""
+        fetches = output.get("diagnostics", {}).get("fetches", {})
+        stale = [key for key, fetch in fetches.items() if fetch.get("source") == 'last_known']
+        return {
+            k: v for k, v in output["metrics"].items()
+            if not any(k == key or k.startswith(key + "_") for key in stale)
+        }
+    
+    def save_to_history(self, output: Dict[str, Any], history: Optional[TieredHistory] = None):
+        """
+        Append this run's metric values to the history store, then start compacting
+        older samples into hourly/daily bars in the background. Last known values
+        (served while a circuit is open) are stored as missing, not as new samples.
+        
+        Args:
+            output: Data dictionary from fetch_all_metrics
+            history: Tiered history store (defaults to history/metrics*.bin)
+        """
+        history = history or TieredHistory(metrics=self.TRACKED_METRICS)
+        try:
+            if len(history.raw) == 0:
+                print(f"⚠️  WARNING: no metric history at {history.raw.path} - starting a new, empty history")
+            if history.append(output["timestamp_unix"], self._measured_metrics(output)):
+                print(f"✅ History appended: {history.raw.path} ({len(history.raw)} records)")
+            history.compact_in_background()
+        except Exception as e:
+            print(f"❌ Failed to append history: {e}")
+    
+    def update_rolling_stats(self, output: Dict[str, Any], history: Optional[MetricHistory] = None):
+        """
+        Add this run's values to the rolling statistics and put them in the output's stats section.
+        On first use (no saved state) the statistics are seeded from the last 30 days of history.
+        Last known values (served while a circuit is open) are not added again.
+        
+        Args:
+            output: Data dictionary from fetch_all_metrics (gets a "stats" key)
+            history: History store used for seeding (defaults to history/metrics.bin)
+        """
+        try:
+            stats = RollingStats(self.NOTIFICATION_THRESHOLDS)
+            if stats.is_empty():
+                history = history or MetricHistory()
+                since = output["timestamp_unix"] - max(HORIZONS.values())
+                for timestamp, values in history.read_range(since, output["timestamp_unix"] - 1):
+                    stats.update(timestamp, values)
+            
+            stats.update(output["timestamp_unix"], self._measured_metrics(output))
+            stats.save()
+            output["stats"] = stats.summary()
+        except Exception as e:
+            print(f"⚠️  Failed to update rolling stats: {e}")
+    
     def load_old_data(self, filename: str = "dashboard_data.json") -> Optional[Dict[str, Any]]:
         """
-        Load previous metrics data from JSON file.
+        Load previous metrics data (from the SQLite store when enabled, else the JSON file).
         
         Args:
             filename: JSON filename to load
@@ -456,8 +555,14 @@ class MetricsFetcher:
             Previous data dictionary or None if file doesn't exist
         """
         try:
+            if self.store is not None:
+                self.previous_data = self.store.latest_metrics_run()
+                if self.previous_data is not None:
+                    return self.previous_data
+            
             with open(filename, 'r') as f:
-                return json.load(f)
+                self.previous_data = json.load(f)  # Last known values for open circuits
+                return self.previous_data
         except FileNotFoundError:
             print("ℹ️  No previous data found (first run)")
             return None
@@ -467,7 +572,7 @@ class MetricsFetcher:
     
     def check_metrics_changed(self, new_data: Dict[str, Any], old_data: Optional[Dict[str, Any]]) -> tuple[bool, list]:
         """
-        Check if any of the 6 strategic metrics have changed beyond their thresholds.
+        Check if any tracked metric has changed beyond its threshold.
         
         Args:
             new_data: Newly fetched metrics
@@ -476,67 +581,21 @@ class MetricsFetcher:
         Returns:
             Tuple of (should_notify: bool, changed_metrics: list)
         """
-        # The 6 metrics to track
-        tracked_metrics = [
-            'us_10y_yield',
-            'fed_net_liquidity',
-            'bitcoin_price',
-            'stablecoin_mcap',
-            'usdt_dominance',
-            'rwa_tvl'
-        ]
-        
-        # Metrics that use absolute threshold instead of percentage
-        absolute_threshold_metrics = ['us_10y_yield']
+        tracked_metrics = list(self.TRACKED_METRICS)
         
         # If no old data exists (first run), notify
         if old_data is None:
             return True, tracked_metrics
         
-        changed_metrics = []
-        old_metrics = old_data.get('metrics', {})
-        new_metrics = new_data.get('metrics', {})
-        self.metric_changes = {}  # Reset changes dictionary
-        
-        # Check each metric for threshold-based changes
-        for metric in tracked_metrics:
-            old_value = old_metrics.get(metric)
-            new_value = new_metrics.get(metric)
-            
-            # Skip if either value is None
-            if old_value is None or new_value is None:
-                if old_value != new_value:
-                    changed_metrics.append(metric)
-                continue
-            
-            # Skip if values are exactly equal (no change at all)
-            if old_value == new_value:
-                continue
-            
-            # Get threshold for this metric
-            threshold = self.NOTIFICATION_THRESHOLDS.get(metric, 0)
-            
-            # Calculate change based on metric type
-            if metric in absolute_threshold_metrics:
-                # Absolute change (e.g., yield 4.15% -> 4.20% = 0.05 change)
-                absolute_change = abs(new_value - old_value)
-                exceeds_threshold = absolute_change >= threshold
-                pct_change = ((new_value - old_value) / old_value) * 100 if old_value != 0 else 0
-            else:
-                # Percentage change
-                pct_change = ((new_value - old_value) / old_value) * 100 if old_value != 0 else 0
-                exceeds_threshold = abs(pct_change) >= threshold
-            
-            # Mark as changed if threshold exceeded
-            if exceeds_threshold:
-                # Store the change for notification formatting (ONLY if threshold exceeded)
-                self.metric_changes[metric] = {
-                    'old': old_value,
-                    'new': new_value,
-                    'pct_change': pct_change,
-                    'direction': '▲' if new_value > old_value else '▼'
-                }
-                changed_metrics.append(metric)
+        # All metrics in one vectorized pass; absolute-threshold metrics (e.g. yield
+        # 4.15% -> 4.20% = 0.05 change) compare the absolute change, the rest the % change
+        changed_metrics, self.metric_changes = evaluate_thresholds(
+            tracked_metrics,
+            old_data.get('metrics', {}),
+            new_data.get('metrics', {}),
+            self.NOTIFICATION_THRESHOLDS,
+            self.ABSOLUTE_THRESHOLD_METRICS
+        )
         
         should_notify = len(changed_metrics) > 0
         return should_notify, changed_metrics
@@ -553,14 +612,6 @@ class MetricsFetcher:
         """
         metrics = data.get('metrics', {})
         
-        # Extract values with fallbacks
-        us_10y = metrics.get('us_10y_yield', 'N/A')
-        fed_liquidity = metrics.get('fed_net_liquidity', 'N/A')
-        btc_price = metrics.get('bitcoin_price', 'N/A')
-        stablecoin_mcap = metrics.get('stablecoin_mcap', 'N/A')
-        usdt_dominance = metrics.get('usdt_dominance', 'N/A')
-        rwa_value = metrics.get('rwa_tvl', 'N/A')
-        
         # Helper function to format metric with delta
         def format_with_delta(value, metric_key, value_formatter):
             if not isinstance(value, (int, float)):
@@ -581,31 +632,26 @@ class MetricsFetcher:
             
             return formatted_value
         
-        # Format numbers with deltas
-        us_10y_str = format_with_delta(us_10y, 'us_10y_yield', lambda v: f"{v:.2f}")
-        fed_liquidity_str = format_with_delta(fed_liquidity, 'fed_net_liquidity', lambda v: f"{v:,.0f}B")
-        btc_price_str = format_with_delta(btc_price, 'bitcoin_price', lambda v: f"{v:,.0f}")
-        stablecoin_mcap_str = format_with_delta(stablecoin_mcap, 'stablecoin_mcap', lambda v: f"{v/1e9:.1f}B")
-        usdt_dominance_str = format_with_delta(usdt_dominance, 'usdt_dominance', lambda v: f"{v:.2f}")
-        rwa_value_str = format_with_delta(rwa_value, 'rwa_tvl', lambda v: f"{v/1e9:.2f}B")
+        # One line per registered metric, grouped into sections in registry order
+        sections = {}
+        for spec in self.METRICS:
+            line = spec.message
+            if line is None:
+                continue
+            value_str = format_with_delta(metrics.get(spec.key, 'N/A'), spec.key, line.formatter)
+            sections.setdefault(line.section, []).append(
+                f"{line.emoji} <b>{line.label}:</b> {line.prefix}{value_str}{line.suffix}"
+            )
+        body = "\n\n".join(f"<b>{section}</b>\n" + "\n".join(lines) for section, lines in sections.items())
         
         # Determine risk status
+        us_10y = metrics.get('us_10y_yield', 'N/A')
         risk_status = "⚠️ RISK OFF" if isinstance(us_10y, (int, float)) and us_10y > 4.5 else "✅ RISK ON"
         
         # Build message
         message = f"""<b>🚨 Strategic Cockpit Update</b>
 
-<b>Macro (The Ceiling)</b>
-🏛️ <b>US 10Y:</b> {us_10y_str}%
-💧 <b>Liquidity:</b> ${fed_liquidity_str}
-
-<b>Market (The Floor)</b>
-₿ <b>BTC:</b> ${btc_price_str}
-🌊 <b>Stablecoins:</b> ${stablecoin_mcap_str}
-
-<b>Alpha Signals</b>
-😨 <b>USDT Dom:</b> {usdt_dominance_str}%
-🏦 <b>RWA TVL:</b> ${rwa_value_str}
+{body}
 
 <b>Status:</b> {risk_status}"""
         
@@ -635,7 +681,7 @@ class MetricsFetcher:
                 "parse_mode": "HTML"
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.http.post(url, json=payload)
             response.raise_for_status()
             
             print("✅ Telegram notification sent successfully")
@@ -655,8 +701,16 @@ def main():
     telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN', '')
     telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
     
+    # Hedge delay and timeout cap in seconds; empty disables them
+    hedge_delay = os.getenv('HEDGE_DELAY', '1.0')
+    hedge_timeout = os.getenv('HEDGE_TIMEOUT', '4')
+    
     # Initialize fetcher
-    fetcher = MetricsFetcher(fred_api_key=fred_api_key)
+    fetcher = MetricsFetcher(
+        fred_api_key=fred_api_key,
+        hedge_delay=float(hedge_delay) if hedge_delay else None,
+        hedge_timeout=float(hedge_timeout) if hedge_timeout else None
+    )
     
     # Load old data for comparison
     old_data = fetcher.load_old_data()
@@ -664,6 +718,12 @@ def main():
     # Fetch all metrics
     new_data = fetcher.fetch_all_metrics()
     
+    # Rolling 1d/7d/30d statistics (added to the output's stats section)
+    fetcher.update_rolling_stats(new_data)
+    
+    # Append to history; compaction runs in the background while notifications go out
+    fetcher.save_to_history(new_data)
+    
     # Check if any metrics changed
     should_notify, changed_metrics = fetcher.check_metrics_changed(new_data, old_data)
     
@@ -678,6 +738,9 @@ def main():
     
     # Save to JSON (always save to update timestamp)
     fetcher.save_to_json(new_data)
+    
+    # Per-metric shards (files of unchanged metrics are left as they are)
+    fetcher.save_shards(new_data)
 
 
 if __name__ == "__main__":
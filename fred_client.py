@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - FRED Client
+One FRED client per process with concurrent, release-aware, incrementally synced series retrieval.
+"""
+
+import threading
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, TYPE_CHECKING
+from http_client import get_http_client
+from state_store import cache_path, load_state, save_state
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Release schedule per series: how often a new observation appears and how many
+# days after the observation date FRED publishes it
+SERIES_SCHEDULE = {
+    'DGS10': {'frequency': 'daily', 'release_lag_days': 1},       # 10Y Treasury yield (business days)
+    'RRPONTSYD': {'frequency': 'daily', 'release_lag_days': 0},   # Overnight reverse repo (same afternoon)
+    'WALCL': {'frequency': 'weekly', 'release_lag_days': 1},      # Fed total assets (Wed, out Thu)
+    'WTREGEN': {'frequency': 'weekly', 'release_lag_days': 1}     # Treasury General Account (Wed, out Thu)
+}
+
+
+FRED_OBSERVATIONS_API = "https://api.stlouisfed.org/fred/series/observations"
+
+# Days of history pulled on the first sync of a series (later runs only fetch new observations)
+BACKFILL_DAYS = 90
+
+
+def next_observation_available(series_id: str, last_observation: date) -> date:
+    """
+    Earliest date a newer observation than last_observation can be published.
+    
+    Args:
+        series_id: FRED series ID
+        last_observation: Date of the newest observation we hold
+    
+    Returns:
+        Date from which it is worth asking FRED again
+    """
+    schedule = SERIES_SCHEDULE.get(series_id)
+    if schedule is None:
+        return last_observation  # Unknown series: always refresh
+    
+    if schedule['frequency'] == 'weekly':
+        next_obs = last_observation + timedelta(days=7)
+    else:
+        next_obs = last_observation + timedelta(days=1)
+        while next_obs.weekday() >= 5:  # Skip weekends
+            next_obs += timedelta(days=1)
+    
+    return next_obs + timedelta(days=schedule['release_lag_days'])
+
+
+class FredClient:
+    """Shared FRED client backed by a persistent, incrementally synced per-series observation store."""
+    
+    def __init__(self, api_key: str, cache_file: Optional[str] = None):
+        """
+        Initialize the FRED client.
+        
+        Args:
+            api_key: FRED API key
+            cache_file: Observation store path (defaults to the cache directory)
+        """
+        self.api_key = api_key
+        self.http = get_http_client()
+        self.cache_file = cache_file or cache_path('fred_cache.json')
+        self.cache = load_state(self.cache_file, {})
+        self._lock = threading.Lock()
+        self._series_locks = {series_id: threading.Lock() for series_id in SERIES_SCHEDULE}
+    
+    def _series_lock(self, series_id: str) -> threading.Lock:
+        """Per-series lock so concurrent callers share a single FRED request."""
+        with self._lock:
+            return self._series_locks.setdefault(series_id, threading.Lock())
+    
+    def _download(self, series_id: str, start: date, end: Optional[date] = None) -> List[List]:
+        """Fetch observations in [start, end] from FRED as [[YYYY-MM-DD, value], ...]."""
+        params = {
+            'series_id': series_id,
+            'api_key': self.api_key,
+            'file_type': 'json',
+            'observation_start': start.strftime('%Y-%m-%d')
+        }
+        if end is not None:
+            params['observation_end'] = end.strftime('%Y-%m-%d')
+        response = self.http.get(FRED_OBSERVATIONS_API, params=params)
+        response.raise_for_status()
+        # FRED marks missing observations with '.'
+        return [[obs['date'], float(obs['value'])] for obs in response.json()['observations']
+                if obs['value'] != '.']
+    
+    def sync(self, series_id: str, start_date: datetime):
+        """
+        Bring the local store for a series up to date.
+        
+        An empty store is backfilled once (BACKFILL_DAYS, or further back if start_date asks for it);
+        a store that doesn't reach back to start_date gets only the missing older range. After that,
+        FRED is asked only for observations after the newest stored one, and only once the
+        release schedule says a newer one can exist.
+        
+        Args:
+            series_id: FRED series ID
+            start_date: Earliest observation date the caller needs
+        """
+        with self._series_lock(series_id):
+            with self._lock:
+                entry = self.cache.get(series_id)
+            entry = dict(entry) if entry and entry.get('observations') else None
+            wanted_start = start_date.date()
+            changed = False
+            
+            if entry is None:
+                backfill_start = min(wanted_start, datetime.now().date() - timedelta(days=BACKFILL_DAYS))
+                entry = {'start': backfill_start.strftime('%Y-%m-%d'),
+                         'observations': self._download(series_id, backfill_start)}
+                print(f"📥 FRED {series_id}: backfilled {len(entry['observations'])} observations")
+                changed = True
+            else:
+                stored_start = datetime.strptime(entry['start'], '%Y-%m-%d').date()
+                if wanted_start < stored_start:
+                    older = self._download(series_id, wanted_start, stored_start - timedelta(days=1))
+                    entry['observations'] = older + entry['observations']
+                    entry['start'] = wanted_start.strftime('%Y-%m-%d')
+                    changed = True
+                
+                last_observation = datetime.strptime(entry['observations'][-1][0], '%Y-%m-%d').date()
+                if datetime.now().date() >= next_observation_available(series_id, last_observation):
+                    newer = self._download(series_id, last_observation + timedelta(days=1))
+                    newer = [obs for obs in newer if obs[0] > entry['observations'][-1][0]]
+                    entry['observations'] = entry['observations'] + newer
+                    changed = True
+            
+            if changed:
+                entry['synced_at'] = datetime.utcnow().isoformat() + "Z"
+                with self._lock:
+                    self.cache[series_id] = entry
+                    save_state(self.cache_file, self.cache)
+    
+    def get_series(self, series_id: str, start_date: datetime) -> 'pd.Series':
+        """
+        Get observations for a series from start_date to today, served from the local store
+        after syncing whatever FRED may have published since the last run.
+        
+        Args:
+            series_id: FRED series ID (e.g. DGS10)
+            start_date: First observation date wanted
+        
+        Returns:
+            Series of observations indexed by date
+        """
+        self.sync(series_id, start_date)
+        with self._lock:
+            observations = self.cache[series_id]['observations']
+        
+        import pandas as pd
+        
+        start = start_date.strftime('%Y-%m-%d')
+        observations = [obs for obs in observations if obs[0] >= start]
+        return pd.Series(
+            [value for _, value in observations],
+            index=pd.to_datetime([day for day, _ in observations]),
+            dtype=float
+        )
+
+
+_clients: Dict[str, FredClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_fred_client(api_key: str) -> FredClient:
+    """
+    Get the process-wide FRED client for an API key, creating it on first use.
+    
+    Args:
+        api_key: FRED API key
+    
+    Returns:
+        Shared FredClient instance
+    """
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = FredClient(api_key)
+        return _clients[api_key]
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - History Retention
+Tiered metric history: raw samples for a limited time, then hourly and daily OHLC bars.
+Compaction runs in a background thread; queries pick the finest tier that fits a point budget.
+"""
+
+import math
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from metric_history import HISTORY_FILE, MetricHistory
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+HOUR = 3600
+DAY = 86400
+
+# How long each tier keeps its records (None = forever). Raw covers the 30d rolling
+# statistics window so they can be re-seeded from it.
+RAW_RETENTION_DAYS = 35
+HOURLY_RETENTION_DAYS = 365
+DAILY_RETENTION_DAYS = None
+
+OHLC_FIELDS = ['open', 'high', 'low', 'close']
+
+
+def _ohlc_columns(metrics: List[str]) -> List[str]:
+    """Column names of an OHLC tier for the given metrics."""
+    return [f"{metric}_{field}" for metric in metrics for field in OHLC_FIELDS]
+
+
+def _first_valid(values: 'np.ndarray') -> float:
+    """First non-NaN value (NaN if none)."""
+    import numpy as np  # Deferred: only compaction and queries need NumPy
+    
+    valid = values[~np.isnan(values)]
+    return float(valid[0]) if len(valid) else math.nan
+
+
+def _last_valid(values: 'np.ndarray') -> float:
+    """Last non-NaN value (NaN if none)."""
+    import numpy as np  # Deferred: only compaction and queries need NumPy
+    
+    valid = values[~np.isnan(values)]
+    return float(valid[-1]) if len(valid) else math.nan
+
+
+class TieredHistory:
+    """
+    Metric history split into retention tiers:
+    
+    raw    history/metrics.bin     every run's values, kept RAW_RETENTION_DAYS
+    1h     history/metrics_1h.bin  hourly OHLC bars, kept HOURLY_RETENTION_DAYS
+    1d     history/metrics_1d.bin  daily OHLC bars, kept DAILY_RETENTION_DAYS
+    
+    Bars are only written for complete buckets, and records are only dropped from a
+    tier once they have been rolled up into the next one.
+    """
+    
+    def __init__(self, raw_path: str = HISTORY_FILE, metrics: Optional[List[str]] = None):
+        """
+        Initialize the tiers.
+        
+        Args:
+            raw_path: Raw history file path (tier files are stored next to it)
+            metrics: Metric columns for a new raw file
+        """
+        self.raw = MetricHistory(raw_path, metrics)
+        self._lock = threading.Lock()
+        self._tiers = None
+    
+    def _tier_files(self) -> Dict[str, MetricHistory]:
+        """Raw plus the OHLC tiers, created lazily once the raw columns are known."""
+        if self._tiers is None:
+            base, ext = os.path.splitext(self.raw.path)
+            columns = _ohlc_columns(self.raw.metrics or [])
+            self._tiers = {
+                'raw': self.raw,
+                '1h': MetricHistory(f"{base}_1h{ext}", columns),
+                '1d': MetricHistory(f"{base}_1d{ext}", columns)
+            }
+        return self._tiers
+    
+    def append(self, timestamp: float, values: Dict[str, Optional[float]]) -> bool:
+        """
+        Append one run's values to the raw tier.
+        
+        Args:
+            timestamp: UNIX timestamp of the run
+            values: Metric values
+        
+        Returns:
+            True if appended
+        """
+        with self._lock:
+            return self.raw.append(timestamp, values)
+    
+    def _roll_up(self, source: 'np.ndarray', target: MetricHistory, bucket: int, from_ohlc: bool,
+                 complete_until: float) -> int:
+        """
+        Append OHLC bars for every complete bucket in source newer than target's last bar.
+        
+        Args:
+            source: Source records (raw values or OHLC bars)
+            target: Tier to append bars to
+            bucket: Bucket size in seconds
+            from_ohlc: Whether source holds OHLC bars (else raw values)
+            complete_until: Buckets ending after this timestamp are still filling
+        
+        Returns:
+            Number of bars written
+        """
+        import numpy as np  # Deferred: only compaction and queries need NumPy
+        
+        last = target.latest()
+        start = last[0] + bucket if last else -math.inf
+        
+        timestamps = source['timestamp']
+        buckets = np.floor(timestamps / bucket) * bucket
+        selected = (buckets >= start) & (buckets + bucket <= complete_until)
+        if not selected.any():
+            return 0
+        
+        source, buckets = source[selected], buckets[selected]
+        bounds = np.flatnonzero(np.diff(buckets)) + 1
+        written = 0
+        for group in np.split(np.arange(len(source)), bounds):
+            bar = {}
+            for metric in self.raw.metrics:
+                if from_ohlc:
+                    opens, highs = source[f"{metric}_open"][group], source[f"{metric}_high"][group]
+                    lows, closes = source[f"{metric}_low"][group], source[f"{metric}_close"][group]
+                else:
+                    opens = highs = lows = closes = source[metric][group]
+                bar[f"{metric}_open"] = _first_valid(opens)
+                bar[f"{metric}_high"] = float(np.fmax.reduce(highs))  # fmax/fmin skip NaN
+                bar[f"{metric}_low"] = float(np.fmin.reduce(lows))
+                bar[f"{metric}_close"] = _last_valid(closes)
+            
+            target.append(float(buckets[group[0]]), {
+                column: None if math.isnan(value) else value for column, value in bar.items()
+            })
+            written += 1
+        return written
+    
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Roll raw samples up into hourly bars and hourly bars into daily bars,
+        then drop records past each tier's retention.
+        
+        Args:
+            now: Current UNIX timestamp (defaults to the newest raw sample)
+        
+        Returns:
+            Dictionary of counters: bars written and records dropped per tier
+        """
+        with self._lock:
+            if len(self.raw) == 0:
+                return {}
+            
+            tiers = self._tier_files()
+            raw = self.raw.array()
+            now = float(raw['timestamp'][-1]) if now is None else now
+            counts = {}
+            
+            # A bucket is complete once a later sample exists (samples arrive in time order)
+            counts['1h_written'] = self._roll_up(raw, tiers['1h'], HOUR, False, float(raw['timestamp'][-1]))
+            hourly = tiers['1h'].array()
+            if len(hourly):
+                counts['1d_written'] = self._roll_up(hourly, tiers['1d'], DAY, True, float(hourly['timestamp'][-1]) + HOUR)
+            del raw, hourly
+            
+            # Retention cutoffs move once a day (keeps the files from being rewritten every run),
+            # and never past what the next tier already covers
+            today = math.floor(now / DAY) * DAY
+            for name, days, next_tier in (('raw', RAW_RETENTION_DAYS, '1h'),
+                                          ('1h', HOURLY_RETENTION_DAYS, '1d'),
+                                          ('1d', DAILY_RETENTION_DAYS, None)):
+                if days is None:
+                    continue
+                cutoff = today - days * DAY
+                if next_tier is not None:
+                    covered = tiers[next_tier].latest()
+                    bucket = HOUR if next_tier == '1h' else DAY
+                    cutoff = min(cutoff, covered[0] + bucket) if covered else -math.inf
+                counts[f"{name}_dropped"] = tiers[name].drop_before(cutoff)
+            return counts
+    
+    def compact_in_background(self) -> threading.Thread:
+        """
+        Start compaction in a background thread. The thread is non-daemon, so the
+        process still waits for it to finish (and leave consistent files) on exit.
+        
+        Returns:
+            The started thread
+        """
+        def run():
+            try:
+                counts = self.compact()
+                if any(counts.values()):
+                    print(f"🗜️  History compacted: {counts}")
+            except Exception as e:
+                print(f"⚠️  History compaction failed: {e}")
+        
+        thread = threading.Thread(target=run, name='history-compaction')
+        thread.start()
+        return thread
+    
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              max_points: int = 1000) -> Tuple[str, 'np.ndarray']:
+        """
+        Get a time range from the finest tier that covers it within max_points.
+        
+        A tier covers the range if it reaches back to start (or to the oldest data held
+        anywhere). If no tier fits the budget, the coarsest covering tier is used.
+        
+        Args:
+            start: First UNIX timestamp to include (None = all history)
+            end: Last UNIX timestamp to include (None = up to now)
+            max_points: Maximum number of records wanted
+        
+        Returns:
+            Tuple of (tier name: 'raw', '1h' or '1d', structured array view). Raw records
+            have one field per metric; OHLC records have <metric>_open/_high/_low/_close fields
+        """
+        with self._lock:
+            tiers = self._tier_files()
+            firsts = {name: tier.array()['timestamp'][:1] for name, tier in tiers.items()}
+        
+        held = [float(first[0]) for first in firsts.values() if len(first)]
+        oldest = min(held) if held else 0.0
+        wanted_start = oldest if start is None else max(start, oldest)
+        
+        coarsest = 'raw', tiers['raw'].slice(start, end)
+        for name, tier in tiers.items():
+            first = firsts[name]
+            if not len(first) or float(first[0]) > wanted_start:
+                continue  # Tier doesn't reach back far enough
+            coarsest = name, tier.slice(start, end)
+            if len(coarsest[1]) <= max_points:
+                break
+        return coarsest
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Shared HTTP Client
+Pooled keep-alive session used by every outbound API call (CoinGecko, DefiLlama, FRED, Telegram, yfinance).
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union, Tuple
+from urllib.parse import urlsplit
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+
+# Default timeout in seconds (override with HTTP_TIMEOUT)
+DEFAULT_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+
+# Max open connections kept per host (override with HTTP_POOL_MAXSIZE)
+DEFAULT_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '4'))
+
+# Requests made in the current context are appended here while track_requests() is active
+_request_log: contextvars.ContextVar = contextvars.ContextVar('request_log', default=None)
+
+# Upper bound on the timeout of requests made in the current context (see request_timeout())
+_timeout_cap: contextvars.ContextVar = contextvars.ContextVar('timeout_cap', default=None)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def _capped(timeout: Any, cap: float) -> Any:
+    """Lower a requests timeout (seconds, (connect, read) tuple or None) to at most cap."""
+    if isinstance(timeout, tuple):
+        return tuple(cap if t is None else min(t, cap) for t in timeout)
+    if isinstance(timeout, (int, float)):
+        return min(timeout, cap)
+    return cap
+
+
+class TimeoutCapAdapter(HTTPAdapter):
+    """HTTPAdapter that applies the request_timeout() cap to every request sent through it."""
+    
+    def send(self, request, timeout=None, **kwargs):
+        cap = _timeout_cap.get()
+        if cap is not None:
+            timeout = _capped(timeout, cap)
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class HttpClient:
+    """Pooled, keep-alive HTTP client with per-host connection limits and default timeouts."""
+    
+    def __init__(self, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE, pool_connections: int = 10):
+        """
+        Initialize the HTTP client.
+        
+        Args:
+            timeout: Default timeout for every request, seconds or (connect, read) tuple
+            pool_maxsize: Max connections kept open per host
+            pool_connections: Number of per-host pools to cache
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        
+        # pool_block=True caps concurrent connections per host instead of opening throwaway ones
+        adapter = TimeoutCapAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Advertise every compression scheme urllib3 can decode (gzip, deflate, br if brotli is installed)
+        accept_encoding = urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": accept_encoding,
+            "Connection": "keep-alive"
+        })
+        self.session.hooks['response'].append(self._log_response)
+    
+    @staticmethod
+    def _log_response(response: requests.Response, *args, **kwargs):
+        """Response hook: record status and body size in the active request log (if any)."""
+        log = _request_log.get()
+        if log is None:
+            return
+        
+        entry = {
+            "host": urlsplit(response.url).hostname,
+            "status": response.status_code,
+            "bytes": None,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1)
+        }
+        log.append(entry)
+        
+        # The body hasn't been read yet (streamed or not): count it as iter_content / .content
+        # pull it from the raw stream. Decoded bytes, since urllib3 doesn't report the wire size
+        # of chunked bodies
+        raw = response.raw
+        stream = getattr(raw, 'stream', None)
+        if stream is None:
+            return
+        entry["bytes"] = 0
+        
+        def counted(*args, **kwargs):
+            for chunk in stream(*args, **kwargs):
+                entry["bytes"] += len(chunk)
+                yield chunk
+        
+        raw.stream = counted
+    
+    def request(self, method: str, url: str, timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            timeout: Per-call timeout (defaults to the client timeout)
+            **kwargs: Passed through to requests.Session.request
+        
+        Returns:
+            Response object
+        """
+        return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request through the pooled session."""
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Get the process-wide shared HTTP client, creating it on first use.
+    
+    Returns:
+        Shared HttpClient instance
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+@contextmanager
+def track_requests() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Collect every request made through HttpClient in this context.
+    Work handed to other threads is included when submitted with submit_with_context.
+    
+    'bytes' is the size of the body read so far, after decompression (the same unit for
+    Content-Length, chunked and streamed responses), so a streamed body counts once it has
+    been consumed. It is None when the transport doesn't expose a raw stream.
+    
+    Yields:
+        List that fills with {'host', 'status', 'bytes', 'elapsed_ms'} per response
+    """
+    log = []
+    token = _request_log.set(log)
+    try:
+        yield log
+    finally:
+        _request_log.reset(token)
+
+
+@contextmanager
+def request_timeout(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Cap the timeout of every request made through HttpClient sessions in this context
+    (including work submitted with submit_with_context while it is active).
+    
+    Args:
+        seconds: Maximum timeout in seconds (None = no cap)
+    """
+    token = _timeout_cap.set(seconds)
+    try:
+        yield
+    finally:
+        _timeout_cap.reset(token)
+
+
+def submit_with_context(executor: Executor, fn: Callable, *args) -> Future:
+    """
+    Submit work to an executor so it runs in a copy of the caller's context
+    (keeps request tracking attached to the metric that triggered it).
+    
+    Args:
+        executor: Executor to submit to
+        fn: Callable to run
+        *args: Arguments for fn
+    
+    Returns:
+        Future for the call
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
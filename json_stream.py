@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Streaming JSON
+Incremental parsing of large top-level JSON arrays, one element at a time.
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+
+WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(chunks: Iterable[bytes], keys: Optional[Sequence[str]] = None) -> Iterator[Any]:
+    """
+    Parse a JSON array incrementally as byte chunks arrive.
+    Only one element is held in memory at a time, so peak memory stays flat
+    regardless of payload size.
+    
+    Args:
+        chunks: Raw UTF-8 byte chunks (e.g. response.iter_content())
+        keys: If given, reduce each object element to just these keys
+    
+    Yields:
+        Array elements in order
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    started = False
+    pending = []  # Decoded text not yet appended to buf
+    pending_len = 0
+    retry_len = 0  # Unparsed text needed before retrying an incomplete element
+    
+    for chunk in _with_end_marker(chunks):
+        final = chunk is None
+        text = text_decoder.decode(b'' if final else chunk, final=final)
+        pending.append(text)
+        pending_len += len(text)
+        
+        # After a failed attempt, wait until the unparsed text has doubled so that
+        # elements spanning many small chunks are not re-joined and re-parsed quadratically
+        if len(buf) - pos + pending_len < retry_len and not final:
+            continue
+        
+        buf = buf[pos:] + ''.join(pending)
+        pos = 0
+        pending = []
+        pending_len = 0
+        retry_len = 0
+        
+        while True:
+            # Skip whitespace and element separators
+            while pos < len(buf) and (buf[pos] in WHITESPACE or (started and buf[pos] == ',')):
+                pos += 1
+            if pos >= len(buf):
+                break
+            
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError("Expected a top-level JSON array")
+                started = True
+                pos += 1
+                continue
+            
+            if buf[pos] == ']':
+                return
+            
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                retry_len = 2 * (len(buf) - pos)
+                break  # Element is incomplete, wait for more data
+            
+            # Only accept the element once a separator follows it: a number decoded up to
+            # the buffer edge or to a partial continuation ("1" then ".5") is not complete yet
+            after = end
+            while after < len(buf) and buf[after] in WHITESPACE:
+                after += 1
+            if after >= len(buf) or buf[after] not in ',]':
+                if final:
+                    if after >= len(buf):
+                        break
+                    raise ValueError(f"Unexpected character {buf[after]!r} after array element")
+                retry_len = 2 * (len(buf) - pos)
+                break
+            
+            pos = end
+            if keys is not None and isinstance(element, dict):
+                element = {key: element.get(key) for key in keys}
+            yield element
+    
+    raise ValueError("Unterminated JSON array")
+
+
+def _with_end_marker(chunks: Iterable[bytes]) -> Iterator[Optional[bytes]]:
+    """Yield the chunks, then None to signal end of input."""
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield None
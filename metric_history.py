@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Metric History Store
+Append-only, memory-mappable time series of every run's metric values, with range reads by timestamp.
+"""
+
+import math
+import os
+import struct
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+HISTORY_FILE = os.path.join('history', 'metrics.bin')
+
+# File layout:
+#   header  MAGIC | uint32 header size | metric names, '\n'-joined, NUL-padded to 8 bytes
+#   records float64 UNIX timestamp + one float64 per metric (NaN = no value that run), little-endian
+MAGIC = b'CKPTHST2'
+_HEADER_PREFIX = struct.Struct('<8sI')
+
+
+def _build_header(metrics: Sequence[str]) -> bytes:
+    """Encode the file header for the given metric columns."""
+    names = '\n'.join(metrics).encode()
+    size = _HEADER_PREFIX.size + len(names)
+    size += -size % 8  # Keep records 8-byte aligned for the memory map
+    return _HEADER_PREFIX.pack(MAGIC, size) + names.ljust(size - _HEADER_PREFIX.size, b'\0')
+
+
+class MetricHistory:
+    """
+    Append-only history of metric values.
+    
+    Each run is one fixed-width record after a small header naming the metric columns.
+    Appends are a single write at the end of the file; readers memory-map the records
+    as a NumPy structured array, so a time range is a binary search plus a slice (no copy).
+    """
+    
+    def __init__(self, path: str = HISTORY_FILE, metrics: Optional[Sequence[str]] = None):
+        """
+        Initialize the history store.
+        
+        Args:
+            path: History file path
+            metrics: Metric columns for a new file. An existing file keeps its own columns
+                and gains the ones it lacks (see _add_columns)
+        """
+        self.path = path
+        self.metrics = list(metrics) if metrics is not None else None
+        self.header_size = 0
+        self._load_header()
+        if metrics is not None and self.header_size:
+            missing = [metric for metric in metrics if metric not in self.metrics]
+            if missing:
+                self._add_columns(missing)
+    
+    def _load_header(self):
+        """
+        Read the metric columns from an existing file.
+        
+        Raises:
+            ValueError if the file exists but doesn't start with a history header
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                prefix = f.read(_HEADER_PREFIX.size)
+                if not prefix:
+                    return  # Empty file: written like a new one
+                if len(prefix) < _HEADER_PREFIX.size or prefix[:8] != MAGIC:
+                    raise ValueError(f"{self.path} is not a metric history file")
+                _, self.header_size = _HEADER_PREFIX.unpack(prefix)
+                names = f.read(self.header_size - _HEADER_PREFIX.size).rstrip(b'\0')
+                self.metrics = names.decode().split('\n')
+        except FileNotFoundError:
+            return
+    
+    def _add_columns(self, metrics: List[str]):
+        """
+        Widen an existing file with new metric columns (rewritten atomically). The columns
+        are added after the existing ones and hold NaN in the records already written.
+        
+        Args:
+            metrics: Metric columns to add
+        """
+        old_size = self.record_size
+        columns = self.metrics + list(metrics)
+        header = _build_header(columns)
+        padding = struct.pack('<' + 'd' * len(metrics), *[math.nan] * len(metrics))
+        
+        tmp_path = self.path + '.tmp'
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            src.seek(self.header_size)
+            dst.write(header)
+            while True:
+                chunk = src.read(old_size * 4096)
+                complete = len(chunk) - len(chunk) % old_size  # A trailing partial record is dropped
+                dst.write(b''.join(chunk[i:i + old_size] + padding for i in range(0, complete, old_size)))
+                if len(chunk) < old_size * 4096:
+                    break
+        os.replace(tmp_path, self.path)
+        self.metrics, self.header_size = columns, len(header)
+        print(f"ℹ️  Added history columns to {self.path}: {', '.join(metrics)}")
+    
+    @property
+    def record_size(self) -> int:
+        """Bytes per record."""
+        return 8 * (1 + len(self.metrics or []))
+    
+    @property
+    def dtype(self) -> 'np.dtype':
+        """NumPy structured dtype of one record."""
+        import numpy as np  # Deferred: only readers need NumPy
+        return np.dtype([('timestamp', '<f8')] + [(metric, '<f8') for metric in self.metrics or []])
+    
+    def __len__(self) -> int:
+        """Number of complete records in the file."""
+        try:
+            return (os.path.getsize(self.path) - self.header_size) // self.record_size
+        except FileNotFoundError:
+            return 0
+    
+    def append(self, timestamp: float, values: Dict[str, Optional[float]]) -> bool:
+        """
+        Append one run's values.
+        
+        Args:
+            timestamp: UNIX timestamp of the run
+            values: Metric values (missing or None metrics are stored as NaN)
+        
+        Returns:
+            True if appended, False if timestamp is not newer than the last record
+        
+        Raises:
+            ValueError if the file doesn't exist yet and no metric columns were given
+        """
+        if self.metrics is None:
+            raise ValueError(f"No metric columns for new history file {self.path}")
+        
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'ab+') as f:
+            if self.header_size == 0:
+                header = _build_header(self.metrics)
+                f.truncate(0)
+                f.write(header)
+                self.header_size = len(header)
+            
+            # Drop a partial record left by an interrupted write so records stay aligned
+            count = (f.seek(0, os.SEEK_END) - self.header_size) // self.record_size
+            end = self.header_size + count * self.record_size
+            
+            if count > 0:
+                f.seek(end - self.record_size)
+                last_timestamp = struct.unpack('<d', f.read(8))[0]
+                if timestamp <= last_timestamp:
+                    print(f"⚠️  History already has a record at or after {timestamp}; not appending")
+                    return False
+            
+            row = [float(timestamp)]
+            for metric in self.metrics:
+                value = values.get(metric)
+                row.append(math.nan if value is None else float(value))
+            
+            f.truncate(end)
+            f.write(struct.pack('<' + 'd' * len(row), *row))
+        return True
+    
+    def array(self) -> 'np.ndarray':
+        """
+        Memory-map all records (read-only, zero copy).
+        
+        Returns:
+            Structured array with a 'timestamp' field and one field per metric
+        """
+        import numpy as np  # Deferred: only readers need NumPy
+        
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.header_size, shape=(count,))
+    
+    def slice(self, start: Optional[float] = None, end: Optional[float] = None) -> 'np.ndarray':
+        """
+        Get the records with start <= timestamp <= end as a view into the memory map.
+        
+        Args:
+            start: First UNIX timestamp to include (None = from the beginning)
+            end: Last UNIX timestamp to include (None = to the end)
+        
+        Returns:
+            Structured array view (no copy)
+        """
+        import numpy as np  # Deferred: only readers need NumPy
+        
+        records = self.array()
+        timestamps = records['timestamp']
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        last = len(records) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        return records[first:max(first, last)]
+    
+    def drop_before(self, timestamp: float) -> int:
+        """
+        Remove records older than timestamp (rewrites the file atomically).
+        
+        Args:
+            timestamp: Oldest UNIX timestamp to keep
+        
+        Returns:
+            Number of records removed
+        """
+        keep = self.slice(timestamp)
+        dropped = len(self) - len(keep)
+        if dropped == 0:
+            return 0
+        
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_build_header(self.metrics))
+            f.write(keep.tobytes())
+        del keep  # Release the memory map before swapping files
+        os.replace(tmp_path, self.path)
+        return dropped
+    
+    def _to_python(self, records: 'np.ndarray') -> List[Tuple[float, Dict[str, Optional[float]]]]:
+        """Convert structured records into (timestamp, {metric: value or None}) tuples."""
+        return [
+            (fields[0], {
+                metric: None if math.isnan(value) else value
+                for metric, value in zip(self.metrics, fields[1:])
+            })
+            for fields in records.tolist()
+        ]
+    
+    def read_range(self, start: Optional[float] = None,
+                   end: Optional[float] = None) -> List[Tuple[float, Dict[str, Optional[float]]]]:
+        """
+        Read the records with start <= timestamp <= end as Python values.
+        
+        Args:
+            start: First UNIX timestamp to include (None = from the beginning)
+            end: Last UNIX timestamp to include (None = to the end)
+        
+        Returns:
+            List of (timestamp, {metric: value or None}) in timestamp order
+        """
+        return self._to_python(self.slice(start, end))
+    
+    def latest(self) -> Optional[Tuple[float, Dict[str, Optional[float]]]]:
+        """
+        Get the most recent record.
+        
+        Returns:
+            (timestamp, values) or None if the history is empty
+        """
+        records = self._to_python(self.array()[-1:])
+        return records[0] if records else None
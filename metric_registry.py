@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Metric Registry
+Declarative metric definitions (sources, parser, threshold, formatters) and the engine that
+plans and runs their upstream requests together, issuing each shared request once per run.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from http_client import request_timeout, submit_with_context, track_requests
+from resilience import CircuitBreaker, CircuitOpenError, call_with_fallback
+
+
+class Request:
+    """An upstream call. Sources that name the same request share one call per run."""
+    
+    def __init__(self, host: Optional[str], fetch: Callable[[Any], Any]):
+        """
+        Define a request.
+        
+        Args:
+            host: Upstream host guarded by a circuit breaker (None = not guarded)
+            fetch: Makes the call given the fetcher (clients, caches) and returns its result
+        """
+        self.host = host
+        self.fetch = fetch
+
+
+class Source:
+    """One way of computing a metric from the results of one or more requests."""
+    
+    def __init__(self, requests: Sequence[str], parse: Callable[..., Union[float, Dict[str, float]]],
+                 label: Union[str, Callable[..., str]], enabled: Optional[Callable[[Any], bool]] = None,
+                 disabled_reason: str = "Source not configured"):
+        """
+        Define a source.
+        
+        Args:
+            requests: Keys of the requests whose results parse receives (in order)
+            parse: Turns request results into the metric value, or a dict of the metric
+                and derived values (e.g. a 7d change); raises if the data is unusable
+            label: Source column text for the report (or a function of the request results)
+            enabled: Whether the source can be used with the fetcher's configuration
+            disabled_reason: Failure message when no source of a metric is enabled
+        """
+        self.requests = list(requests)
+        self.parse = parse
+        self.label = label
+        self.enabled = enabled or (lambda fetcher: True)
+        self.disabled_reason = disabled_reason
+
+
+class MessageLine:
+    """How a metric appears in the Telegram update."""
+    
+    def __init__(self, section: str, emoji: str, label: str, formatter: Callable[[float], str],
+                 prefix: str = "", suffix: str = ""):
+        """
+        Define a message line: "<emoji> <b><label>:</b> <prefix><value><suffix>".
+        
+        Args:
+            section: Section heading the line is grouped under
+            emoji: Leading emoji
+            label: Metric label
+            formatter: Formats the value
+            prefix: Text before the value (e.g. "$")
+            suffix: Text after the value (e.g. "%")
+        """
+        self.section = section
+        self.emoji = emoji
+        self.label = label
+        self.formatter = formatter
+        self.prefix = prefix
+        self.suffix = suffix
+
+
+class MetricSpec:
+    """Declaration of one dashboard metric."""
+    
+    def __init__(self, key: str, name: str, sources: Sequence[Source], threshold: float,
+                 formatter: Callable[[float], str], source_name: str,
+                 absolute_threshold: bool = False, attempts: int = 1,
+                 message: Optional[MessageLine] = None):
+        """
+        Define a metric.
+        
+        Args:
+            key: Metric key in dashboard_data.json
+            name: Display name for the report
+            sources: Sources in priority order (the first is primary, the rest are fallbacks)
+            threshold: Notification threshold (% change, or absolute change if absolute_threshold)
+            formatter: Formats the value for the report
+            source_name: Source column text when the metric fails
+            absolute_threshold: Compare the absolute change against threshold instead of the % change
+            attempts: Tries before the metric is reported as failed
+            message: Telegram line (None = not in the message)
+        """
+        self.key = key
+        self.name = name
+        self.sources = list(sources)
+        self.threshold = threshold
+        self.formatter = formatter
+        self.source_name = source_name
+        self.absolute_threshold = absolute_threshold
+        self.attempts = attempts
+        self.message = message
+
+
+class MetricOutcome:
+    """Result of fetching one metric."""
+    
+    def __init__(self, values: Dict[str, Any], label: str, source: Optional[str], attempts: int,
+                 requests: List[str], error: Optional[Exception] = None):
+        """
+        Create an outcome.
+        
+        Args:
+            values: Metric value plus derived values (the metric is None on failure)
+            label: Report Source column text
+            source: 'primary', 'fallback', 'last_known', or None if the metric failed
+            attempts: Attempts made
+            requests: Keys of the requests the metric issued or waited on
+            error: Final error when the metric failed
+        """
+        self.values = values
+        self.label = label
+        self.source = source
+        self.attempts = attempts
+        self.requests = requests
+        self.error = error
+
+
+class MetricEngine:
+    """
+    Runs metric specs against shared requests.
+    
+    plan() submits, in one go, every distinct request needed by the primary sources of all
+    metrics. Each request runs once per run and its result is shared by every source
+    that names it; fallback requests are only issued when a metric actually falls back.
+    Planned requests and the others (fallbacks, retries) run on separate thread pools, so
+    a hedged fallback starts at once instead of queueing behind slow primaries.
+    """
+    
+    def __init__(self, fetcher: Any, requests: Dict[str, Request], breaker: CircuitBreaker,
+                 hedge_delay: Optional[float] = None, hedge_timeout: Optional[float] = None,
+                 max_workers: int = 8, retry_delay: float = 2):
+        """
+        Initialize the engine.
+        
+        Args:
+            fetcher: Object passed to request and source callables (holds clients and caches)
+            requests: Request registry by key
+            breaker: Per-host circuit breakers
+            hedge_delay: Seconds to wait for a source before also firing the next one
+            hedge_timeout: Request timeout cap for requests of metrics that have a fallback, so an
+                abandoned hedged request doesn't keep its worker (and process exit) waiting
+            max_workers: Concurrent upstream requests per pool (planned / other requests)
+            retry_delay: Seconds between attempts of a metric
+        """
+        self.fetcher = fetcher
+        self.requests = requests
+        self.breaker = breaker
+        self.hedge_delay = hedge_delay
+        self.hedge_timeout = hedge_timeout
+        self.retry_delay = retry_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='request')
+        self._fallback_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fallback')
+        self._planned: set = set()  # Requests started by plan() (run on self._executor)
+        self._futures: Dict[str, Future] = {}
+        self._hedged: set = set()  # Requests of metrics with a fallback (timeout capped)
+        self._lock = threading.Lock()
+        self.request_stats: Dict[str, Dict[str, Any]] = {}  # Per-request timing and HTTP log
+    
+    def _execute(self, key: str) -> Any:
+        """Run one request through its host's breaker, recording its time and HTTP responses."""
+        request = self.requests[key]
+        start = time.perf_counter()
+        timeout = self.hedge_timeout if key in self._hedged else None
+        with track_requests() as responses, request_timeout(timeout):
+            try:
+                if request.host is None:
+                    return request.fetch(self.fetcher)
+                return self.breaker.call(request.host, lambda: request.fetch(self.fetcher))
+            finally:
+                with self._lock:
+                    self.request_stats[key] = {
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                        "responses": list(responses)
+                    }
+    
+    def _submit(self, key: str, retry_failed: bool = False) -> Future:
+        """Get the shared future for a request, starting it if needed (or again if it failed)."""
+        with self._lock:
+            future = self._futures.get(key)
+            failed = future is not None and future.done() and future.exception() is not None
+            if future is None or (retry_failed and failed):
+                executor = self._executor if key in self._planned else self._fallback_executor
+                future = self._futures[key] = submit_with_context(executor, self._execute, key)
+            return future
+    
+    def _available(self, spec: MetricSpec) -> Tuple[List[Tuple[int, Source]], List[str]]:
+        """
+        Enabled sources whose hosts' circuits allow a call, as (position in spec.sources, source),
+        plus the hosts that are open.
+        """
+        usable, open_hosts = [], []
+        for position, source in enumerate(spec.sources):
+            if not source.enabled(self.fetcher):
+                continue
+            hosts = {self.requests[key].host for key in source.requests} - {None}
+            closed = [host for host in hosts if not self.breaker.available(host)]
+            if closed:
+                open_hosts.extend(closed)
+            else:
+                usable.append((position, source))
+        return usable, open_hosts
+    
+    def _track_hedged(self, spec: MetricSpec):
+        """Mark the requests of a metric with a fallback, so their timeout is capped."""
+        if len(spec.sources) > 1:
+            with self._lock:
+                self._hedged.update(key for source in spec.sources for key in source.requests)
+    
+    def plan(self, specs: Sequence[MetricSpec]) -> List[str]:
+        """
+        Start every distinct request the metrics' primary sources need, all at once.
+        
+        Args:
+            specs: Metrics about to be fetched
+        
+        Returns:
+            Keys of the requests started
+        """
+        planned = []
+        for spec in specs:
+            self._track_hedged(spec)
+            usable, _ = self._available(spec)
+            if usable:
+                planned.extend(key for key in usable[0][1].requests if key not in planned)
+        with self._lock:
+            self._planned.update(planned)
+        for key in planned:
+            self._submit(key)
+        return planned
+    
+    def _run_source(self, source: Source, retry_failed: bool, used: List[str]) -> Tuple[Dict[str, Any], str]:
+        """Wait for a source's requests (adding them to used) and parse them into (values, label)."""
+        futures = [self._submit(key, retry_failed) for key in source.requests]
+        with self._lock:
+            used.extend(key for key in source.requests if key not in used)
+        results = [future.result() for future in futures]
+        return source.parse(*results), source.label(*results) if callable(source.label) else source.label
+    
+    def _run_sources(self, sources: List[Tuple[int, Source]], retry_failed: bool, used: List[str]):
+        """
+        Try (position, source) pairs in priority order (hedged); a source's requests are only
+        issued (and added to used) once it is tried. Returns (winning position, (values, label)).
+        """
+        position, source = sources[0]
+        
+        def first():
+            return position, self._run_source(source, retry_failed, used)
+        
+        if len(sources) == 1:
+            return first()
+        _, result = call_with_fallback(
+            first, lambda: self._run_sources(sources[1:], retry_failed, used), self.hedge_delay
+        )
+        return result
+    
+    def run(self, spec: MetricSpec, previous: Optional[Dict[str, Any]] = None) -> MetricOutcome:
+        """
+        Fetch one metric: sources in priority order with hedging, retried up to spec.attempts.
+        If every usable source's circuit is open, the previous run's value is served instead.
+        
+        Args:
+            spec: Metric to fetch
+            previous: Previous run's metrics (for last known values)
+        
+        Returns:
+            Outcome with values, report label and diagnostics
+        """
+        self._track_hedged(spec)
+        used: List[str] = []
+        error: Optional[Exception] = None
+        for attempt in range(spec.attempts):
+            usable, open_hosts = self._available(spec)
+            if not usable:
+                enabled = [source for source in spec.sources if source.enabled(self.fetcher)]
+                if not enabled:
+                    return MetricOutcome({spec.key: None}, spec.source_name, None, attempt + 1, used,
+                                         ValueError(spec.sources[0].disabled_reason))
+                return self._last_known(spec, previous or {}, open_hosts[0], used, attempt + 1)
+            
+            try:
+                position, (values, label) = self._run_sources(usable, attempt > 0, used)
+                if not isinstance(values, dict):
+                    values = {spec.key: values}
+                source = 'primary' if position == 0 else 'fallback'
+                return MetricOutcome(values, label, source, attempt + 1, list(used))
+            except Exception as e:
+                error = e
+                if attempt < spec.attempts - 1:
+                    time.sleep(self.retry_delay)
+        
+        return MetricOutcome({spec.key: None}, spec.source_name, None, spec.attempts, list(used), error)
+    
+    def _last_known(self, spec: MetricSpec, previous: Dict[str, Any], host: str,
+                    used: List[str], attempts: int) -> MetricOutcome:
+        """Outcome serving the previous run's value (and derived values) for an open circuit."""
+        if previous.get(spec.key) is None:
+            return MetricOutcome({spec.key: None}, spec.source_name, None, attempts, used,
+                                 CircuitOpenError(f"Circuit open for {host}"))
+        values = {k: v for k, v in previous.items() if k == spec.key or k.startswith(spec.key + "_")}
+        return MetricOutcome(values, f"Last known ({host} circuit open)", 'last_known', attempts, used)
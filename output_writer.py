@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Output Writer
+Writes the frontend JSON files. In compact mode (OUTPUT_MODE=compact) the JSON is minified and
+precompressed .gz and .br siblings are written next to it, so a static host or CDN can serve
+the compressed bytes directly. Every file is replaced atomically.
+Sections can also be written as content-addressed shards listed in a manifest (write_shards).
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+# 'pretty' (indented JSON only) or 'compact' (minified JSON plus .gz/.br siblings)
+OUTPUT_MODE = os.getenv('OUTPUT_MODE', 'pretty')
+
+COMPRESSED_SUFFIXES = ['.gz', '.br']
+
+# Shard directories hold <name>.<hash>.json files plus this manifest
+MANIFEST_FILE = 'manifest.json'
+SHARD_HASH_LENGTH = 16
+
+
+@functools.lru_cache(maxsize=None)
+def _brotli() -> Any:
+    """The brotli module, or None (warned about once) if it is not installed."""
+    try:
+        import brotli  # In requirements.txt; optional for local runs
+    except ImportError:
+        print("⚠️  brotli is not installed - compact mode writes no .br files (pip install brotli)")
+        return None
+    return brotli
+
+
+def _brotli_compress(data: bytes) -> Optional[bytes]:
+    """Brotli-compress data at maximum quality, or None if the brotli package is not installed."""
+    brotli = _brotli()
+    return brotli.compress(data, quality=11) if brotli is not None else None
+
+
+def _replace_file(path: str, data: bytes):
+    """Atomically replace a file's contents (write to a temp file, then rename)."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp creates 0600; served and committed files must be world-readable
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _remove_stale(path: str):
+    """Remove a compressed sibling that would otherwise serve outdated content."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _encode(data: Any, mode: str) -> bytes:
+    """Serialize data as indented ('pretty') or minified ('compact') JSON."""
+    if mode not in ('pretty', 'compact'):
+        raise ValueError(f"Unknown output mode: {mode}")
+    if mode == 'pretty':
+        return json.dumps(data, indent=2).encode('utf-8')
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _write_payload(filename: str, payload: bytes, mode: str):
+    """Write encoded JSON, plus its compressed siblings in compact mode."""
+    if mode == 'pretty':
+        _replace_file(filename, payload)
+        for suffix in COMPRESSED_SUFFIXES:
+            _remove_stale(filename + suffix)
+        return
+    
+    siblings = {
+        '.gz': gzip.compress(payload, compresslevel=9, mtime=0),  # mtime=0: same input, same bytes
+        '.br': _brotli_compress(payload)
+    }
+    
+    # Compressed siblings first: once the new JSON is visible, its compressed copies already match
+    for suffix, compressed in siblings.items():
+        if compressed is None:
+            _remove_stale(filename + suffix)
+        else:
+            _replace_file(filename + suffix, compressed)
+    _replace_file(filename, payload)
+
+
+def write_json(data: Any, filename: str, mode: Optional[str] = None):
+    """
+    Write a frontend JSON file.
+    
+    Args:
+        data: JSON-serializable data
+        filename: Output filename
+        mode: 'pretty' or 'compact' (defaults to OUTPUT_MODE)
+    """
+    mode = mode or OUTPUT_MODE
+    _write_payload(filename, _encode(data, mode), mode)
+
+
+def _load_manifest(path: str) -> Dict[str, Any]:
+    """Read a shard manifest (empty if missing or unreadable)."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_shards(directory: str, shards: Dict[str, Any], mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write content-addressed shards and their manifest.
+    
+    Each shard is stored as <name>.<hash>.json, where hash is the start of the SHA-256 of its
+    bytes, so a shard file never changes once written and can be cached as immutable. The
+    manifest (manifest.json, the only file that changes in place) maps each name to its file.
+    Its updated_at only moves when a shard changes, so an unchanged run leaves the directory
+    untouched. Shard files referenced by neither the new nor the previous manifest are removed
+    (the previous generation stays for clients still reading the old manifest).
+    
+    Args:
+        directory: Shard directory (e.g. shards/metrics)
+        shards: Shard data by name
+        mode: 'pretty' or 'compact' (defaults to OUTPUT_MODE)
+    
+    Returns:
+        The manifest written
+    """
+    mode = mode or OUTPUT_MODE
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    previous = _load_manifest(manifest_path)
+    
+    entries = {}
+    for name, data in shards.items():
+        payload = _encode(data, mode)
+        digest = hashlib.sha256(payload).hexdigest()[:SHARD_HASH_LENGTH]
+        filename = f"{name}.{digest}.json"
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            _write_payload(path, payload, mode)
+        entries[name] = {"file": filename, "hash": digest, "bytes": len(payload)}
+    
+    previous_entries = previous.get('shards', {})
+    if entries == previous_entries and previous.get('mode') == mode:
+        return previous
+    
+    manifest = {
+        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "mode": mode,
+        "shards": entries
+    }
+    write_json(manifest, manifest_path, mode)
+    
+    # Remove shard files no manifest generation still points to
+    keep = {MANIFEST_FILE}
+    keep.update(entry['file'] for entry in list(entries.values()) + list(previous_entries.values()))
+    keep.update(name + suffix for name in list(keep) for suffix in COMPRESSED_SUFFIXES)
+    for filename in os.listdir(directory):
+        if filename not in keep and not filename.startswith('.tmp_'):
+            _remove_stale(os.path.join(directory, filename))
+    return manifest
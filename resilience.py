@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Resilience Helpers
+Primary/fallback execution with optional request hedging, and persistent per-host circuit breakers.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Optional, Tuple
+import requests
+from http_client import submit_with_context
+from state_store import cache_path, load_state, save_state
+
+
+def call_with_fallback(primary: Callable[[], Any], fallback: Callable[[], Any],
+                       hedge_delay: Optional[float] = None) -> Tuple[str, Any]:
+    """
+    Get a value from a primary source, falling back to a secondary one.
+    A source "answers" by returning; raising means it failed.
+    
+    Without hedge_delay the fallback only runs after the primary has failed.
+    With hedge_delay, the fallback is also fired if the primary has not answered
+    within that many seconds (or as soon as it fails); the first valid answer wins
+    and the other call is abandoned. Both calls are waited on, so a fallback that
+    answers while the primary is failing is still used.
+    
+    Args:
+        primary: Primary source
+        fallback: Fallback source
+        hedge_delay: Seconds to wait for the primary before hedging (None = sequential)
+    
+    Returns:
+        Tuple of ('primary' or 'fallback', value)
+    
+    Raises:
+        The last source's exception if both fail
+    """
+    if hedge_delay is None:
+        try:
+            return 'primary', primary()
+        except Exception:
+            return 'fallback', fallback()
+    
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hedge')
+    try:
+        futures = {submit_with_context(executor, primary): 'primary'}
+        done, _ = wait(futures, timeout=hedge_delay)
+        
+        primary_future = next(iter(futures))
+        if done and primary_future.exception() is None:
+            return 'primary', primary_future.result()
+        
+        # Primary is slow or already failed: race the fallback against it
+        futures[submit_with_context(executor, fallback)] = 'fallback'
+        pending = set(futures)
+        last_error = None
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Already-finished calls come back at once; prefer the primary if both have answered
+            for future in sorted(done, key=lambda f: futures[f] != 'primary'):
+                if future.exception() is None:
+                    return futures[future], future.result()
+                last_error = future.exception()
+        
+        raise last_error
+    finally:
+        # Don't wait for the losing call; it finishes (and is discarded) in the background.
+        # A running call can't be cancelled, so callers bound it with a request timeout
+        # (see http_client.request_timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_host_failure(error: Exception) -> bool:
+    """
+    Whether an error says the host itself is unhealthy: a transport error (connection,
+    timeout, broken stream) or a 5xx / 429 response. Other errors (4xx, unparseable
+    content) don't count against the host's breaker.
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code >= 500 or response.status_code == 429
+    return isinstance(error, (requests.ConnectionError, requests.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the upstream's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker whose state persists between process runs.
+    
+    closed    -> calls go through; failures are counted, at most one per host per run
+                 (concurrent requests failing together are one outage, not several)
+    open      -> calls are refused immediately (no timeout wait) until the cooldown passes
+    half_open -> after the cooldown, the run that finds the breaker open makes the trial:
+                 all of its calls to the host go through (concurrent siblings included);
+                 a success closes the breaker, a failure re-opens it
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, state_file: Optional[str] = None, failure_threshold: int = 3,
+                 cooldown: float = 1800):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            state_file: State file path (defaults to the cache directory)
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown: Seconds an open breaker refuses calls before a half-open trial
+        """
+        self.state_file = state_file or cache_path('circuit_state.json')
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hosts = load_state(self.state_file, {})
+        self._failed_hosts = set()  # Hosts whose failure this run has already been counted
+        self._lock = threading.Lock()
+    
+    def _host(self, host: str) -> Dict[str, Any]:
+        """State entry for a host (caller holds the lock)."""
+        return self.hosts.setdefault(host, {'state': self.CLOSED, 'failures': 0, 'opened_at': None})
+    
+    def _available(self, host: str) -> bool:
+        """Whether a call to host could go out now (caller holds the lock)."""
+        entry = self._host(host)
+        if entry['state'] == self.OPEN:
+            return time.time() - entry['opened_at'] >= self.cooldown
+        return True
+    
+    def available(self, host: str) -> bool:
+        """
+        Check whether a call to host could go out, without moving an open breaker to half_open.
+        
+        Args:
+            host: Upstream host name
+        
+        Returns:
+            True if the breaker would currently let a call through
+        """
+        with self._lock:
+            return self._available(host)
+    
+    def allow(self, host: str) -> bool:
+        """
+        Check whether a call to host may go out, moving open -> half_open once the cooldown has
+        passed. The trial is this run: while half_open, every call of the run is let through.
+        
+        Args:
+            host: Upstream host name
+        
+        Returns:
+            True if the call should be attempted
+        """
+        with self._lock:
+            if not self._available(host):
+                return False
+            entry = self._host(host)
+            if entry['state'] == self.OPEN:
+                entry['state'] = self.HALF_OPEN
+                print(f"🔌 Circuit half-open for {host}: trying again")
+                save_state(self.state_file, self.hosts)
+            return True
+    
+    def record_success(self, host: str):
+        """Record a successful call (closes the breaker)."""
+        with self._lock:
+            entry = self._host(host)
+            changed = entry['state'] != self.CLOSED or entry['failures'] != 0
+            entry.update({'state': self.CLOSED, 'failures': 0, 'opened_at': None})
+            if changed:
+                save_state(self.state_file, self.hosts)
+    
+    def record_failure(self, host: str):
+        """Record a failed call (opens the breaker on a failed trial or too many failures)."""
+        with self._lock:
+            entry = self._host(host)
+            if entry['state'] == self.OPEN or (entry['state'] == self.CLOSED and host in self._failed_hosts):
+                return  # This run's failure for host is already counted
+            self._failed_hosts.add(host)
+            entry['failures'] += 1
+            if entry['state'] == self.HALF_OPEN or entry['failures'] >= self.failure_threshold:
+                if entry['state'] != self.OPEN:
+                    print(f"🔌 Circuit open for {host}: skipping it for {self.cooldown / 60:.0f} min")
+                entry['state'] = self.OPEN
+                entry['opened_at'] = time.time()
+            save_state(self.state_file, self.hosts)
+    
+    def call(self, host: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn through the breaker for host.
+        
+        Args:
+            host: Upstream host name
+            fn: Call to make
+        
+        Returns:
+            fn's result
+        
+        Raises:
+            CircuitOpenError if the breaker is open, otherwise whatever fn raises
+            (only transport errors and 5xx / 429 responses are recorded as failures)
+        """
+        if not self.allow(host):
+            raise CircuitOpenError(f"Circuit open for {host}")
+        try:
+            result = fn()
+        except Exception as e:
+            if _is_host_failure(e):
+                self.record_failure(host)
+            raise
+        self.record_success(host)
+        return result
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker, loading its state on first use.
+    
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(cooldown=float(os.getenv('CIRCUIT_COOLDOWN', '1800')))
+        return _breaker
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - HTTP Response Cache
+Persistent conditional-request cache (ETag / Last-Modified) that stores parsed results,
+so unchanged upstream data is neither downloaded nor parsed again.
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import requests
+from state_store import cache_path, load_state, save_state
+
+
+# Seconds a stored result is reused without contacting the upstream at all.
+# Matched by URL prefix; anything else is always revalidated (TTL 0).
+ENDPOINT_TTLS = {
+    'https://api.coingecko.com/': 60,                 # Prices move constantly: revalidate every run
+    'https://stablecoins.llama.fi/': 1800,            # DefiLlama recomputes supplies ~hourly
+    'https://api.llama.fi/protocols': 1800,           # DefiLlama recomputes TVL ~hourly
+    'https://www.investing.com/': 0                   # Actuals can land any minute: always revalidate
+}
+
+
+class ResponseCache:
+    """On-disk cache of parsed responses keyed by request, with HTTP validators and TTLs."""
+    
+    def __init__(self, cache_file: Optional[str] = None, ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize the response cache.
+        
+        Args:
+            cache_file: Cache file path (defaults to the cache directory)
+            ttls: URL prefix -> TTL seconds (defaults to ENDPOINT_TTLS)
+        """
+        self.cache_file = cache_file or cache_path('http_cache.json')
+        self.ttls = ENDPOINT_TTLS if ttls is None else ttls
+        self.entries = load_state(self.cache_file, {})
+        self._lock = threading.Lock()
+    
+    def ttl_for(self, key: str) -> float:
+        """
+        Get the TTL for a cache key (request URL).
+        
+        Args:
+            key: Cache key, starting with the request URL
+        
+        Returns:
+            TTL in seconds (longest matching prefix wins)
+        """
+        matches = [prefix for prefix in self.ttls if key.startswith(prefix)]
+        return self.ttls[max(matches, key=len)] if matches else 0
+    
+    def fetch(self, key: str, send: Callable[[Dict[str, str]], requests.Response],
+              parse: Callable[[requests.Response], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Get a parsed result, going to the network only when needed.
+        
+        Within the TTL the stored result is returned with no request. Otherwise the request
+        is sent with If-None-Match/If-Modified-Since; a 304 reuses the stored result without
+        parsing, anything else is parsed and stored with its new validators.
+        
+        Args:
+            key: Cache key (request URL, plus body for POSTs)
+            send: Sends the request with the given extra headers and returns the response
+            parse: Turns a 200 response into a JSON-serializable result
+            ttl: Override for the endpoint TTL in seconds
+        
+        Returns:
+            Parsed result
+        """
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        with self._lock:
+            entry = self.entries.get(key)
+        
+        now = time.time()
+        if entry and now - entry['stored_at'] < ttl:
+            return copy.deepcopy(entry['parsed'])
+        
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = send(headers)
+        with response:
+            if response.status_code == 304 and entry:
+                entry['stored_at'] = now
+                self._store(key, entry)
+                return copy.deepcopy(entry['parsed'])
+            
+            response.raise_for_status()
+            parsed = parse(response)
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified or ttl > 0:
+            self._store(key, {
+                'stored_at': now,
+                'etag': etag,
+                'last_modified': last_modified,
+                'parsed': copy.deepcopy(parsed)  # Callers may mutate what they get back
+            })
+        return parsed
+    
+    def _store(self, key: str, entry: Dict[str, Any]):
+        """Save an entry and persist the cache file."""
+        with self._lock:
+            self.entries[key] = entry
+            save_state(self.cache_file, self.entries)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide response cache, loading it on first use.
+    
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
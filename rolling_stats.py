@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Rolling Statistics
+Per-metric rolling change, mean/stdev, min/max and EWMA over 1d/7d/30d windows,
+updated in O(1) amortized time per sample and persisted between runs.
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+from state_store import cache_path, load_state, save_state
+
+
+# Rolling windows (seconds)
+HORIZONS = {
+    '1d': 86400,
+    '7d': 7 * 86400,
+    '30d': 30 * 86400
+}
+
+# A change is only reported once the window's samples span this share of the horizon
+MIN_CHANGE_COVERAGE = 0.9
+
+
+class _Window:
+    """
+    One sliding window over a metric's samples.
+    
+    Mean/variance use Welford's update with the matching removal step; min/max use
+    monotonic deques of sample sequence numbers; the EWMA decays with elapsed time
+    (time constant = horizon), so irregular sampling is handled.
+    """
+    
+    def __init__(self, horizon: float, state: Optional[Dict[str, Any]] = None):
+        """Create a window of horizon seconds, restoring state if given."""
+        state = state or {}
+        self.horizon = horizon
+        self.head = state.get('head', 0)          # Sequence number of the oldest sample in the window
+        self.n = state.get('n', 0)
+        self.mean = state.get('mean', 0.0)
+        self.m2 = state.get('m2', 0.0)
+        self.min_q = deque(state.get('min_q', []))
+        self.max_q = deque(state.get('max_q', []))
+        self.ewma = state.get('ewma')
+        self.ewma_ts = state.get('ewma_ts')
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize for persistence."""
+        return {
+            'head': self.head, 'n': self.n, 'mean': self.mean, 'm2': self.m2,
+            'min_q': list(self.min_q), 'max_q': list(self.max_q),
+            'ewma': self.ewma, 'ewma_ts': self.ewma_ts
+        }
+    
+    def add(self, seq: int, ts: float, value: float, value_at):
+        """Add sample seq (value_at(seq) gives any retained sample's value)."""
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        
+        while self.min_q and value_at(self.min_q[-1]) >= value:
+            self.min_q.pop()
+        self.min_q.append(seq)
+        while self.max_q and value_at(self.max_q[-1]) <= value:
+            self.max_q.pop()
+        self.max_q.append(seq)
+        
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            alpha = 1 - math.exp(-max(ts - self.ewma_ts, 0) / self.horizon)
+            self.ewma += alpha * (value - self.ewma)
+        self.ewma_ts = ts
+    
+    def evict(self, now: float, sample_at):
+        """Drop samples older than the horizon (sample_at(seq) gives (ts, value))."""
+        while self.n > 1:
+            ts, value = sample_at(self.head)
+            if ts >= now - self.horizon:
+                break
+            self.n -= 1
+            delta = value - self.mean
+            self.mean -= delta / self.n
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+            self.head += 1
+            if self.min_q[0] < self.head:
+                self.min_q.popleft()
+            if self.max_q[0] < self.head:
+                self.max_q.popleft()
+
+
+class MetricStats:
+    """Rolling statistics for one metric over all HORIZONS, sharing one sample buffer."""
+    
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        """
+        Initialize (or restore) the metric's statistics.
+        
+        Args:
+            state: State from to_state(), or None to start empty
+        """
+        state = state or {}
+        self.samples = deque(tuple(sample) for sample in state.get('samples', []))  # (ts, value)
+        self.first_seq = state.get('first_seq', 0)  # Sequence number of samples[0]
+        windows = state.get('windows', {})
+        self.windows = {name: _Window(horizon, windows.get(name)) for name, horizon in HORIZONS.items()}
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize for persistence."""
+        return {
+            'samples': [list(sample) for sample in self.samples],
+            'first_seq': self.first_seq,
+            'windows': {name: window.to_state() for name, window in self.windows.items()}
+        }
+    
+    def _sample(self, seq: int) -> Tuple[float, float]:
+        """(ts, value) of a retained sample by sequence number."""
+        return self.samples[seq - self.first_seq]
+    
+    def _value(self, seq: int) -> float:
+        """Value of a retained sample by sequence number."""
+        return self.samples[seq - self.first_seq][1]
+    
+    def update(self, ts: float, value: float) -> bool:
+        """
+        Add a sample and slide every window forward.
+        
+        Args:
+            ts: UNIX timestamp of the sample
+            value: Metric value
+        
+        Returns:
+            True if added, False if not newer than the last sample
+        """
+        if self.samples and ts <= self.samples[-1][0]:
+            return False
+        
+        seq = self.first_seq + len(self.samples)
+        self.samples.append((ts, value))
+        for window in self.windows.values():
+            window.add(seq, ts, value, self._value)
+            window.evict(ts, self._sample)
+        
+        # Keep only what the longest window still needs
+        oldest_needed = min(window.head for window in self.windows.values())
+        while self.first_seq < oldest_needed:
+            self.samples.popleft()
+            self.first_seq += 1
+        return True
+    
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Current statistics per horizon.
+        
+        Returns:
+            Dictionary of horizon -> {change_pct, mean, stdev, min, max, ewma, samples}
+        """
+        result = {}
+        if not self.samples:
+            return result
+        
+        now, latest = self.samples[-1]
+        for name, window in self.windows.items():
+            oldest_ts, oldest = self._sample(window.head)
+            change = None
+            if now - oldest_ts >= window.horizon * MIN_CHANGE_COVERAGE and oldest != 0:
+                change = (latest - oldest) / abs(oldest) * 100
+            result[name] = {
+                'change_pct': change,
+                'mean': window.mean,
+                'stdev': math.sqrt(window.m2 / (window.n - 1)) if window.n > 1 else None,
+                'min': self._value(window.min_q[0]),
+                'max': self._value(window.max_q[0]),
+                'ewma': window.ewma,
+                'samples': window.n
+            }
+        return result
+
+
+class RollingStats:
+    """Rolling statistics for a set of metrics, persisted in the cache directory."""
+    
+    def __init__(self, metrics: Iterable[str], state_file: Optional[str] = None):
+        """
+        Initialize, restoring saved state.
+        
+        Args:
+            metrics: Metric keys to track
+            state_file: State file path (defaults to the cache directory)
+        """
+        self.state_file = state_file or cache_path('rolling_stats.json')
+        state = load_state(self.state_file, {})
+        self.metrics = {metric: MetricStats(state.get(metric)) for metric in metrics}
+    
+    def is_empty(self) -> bool:
+        """True if no metric has any samples yet."""
+        return not any(stats.samples for stats in self.metrics.values())
+    
+    def update(self, ts: float, values: Dict[str, Optional[float]]):
+        """
+        Add one run's values (missing / None / non-finite values are skipped).
+        
+        Args:
+            ts: UNIX timestamp of the run
+            values: Metric key -> value
+        """
+        for metric, stats in self.metrics.items():
+            value = values.get(metric)
+            if value is not None and math.isfinite(value):
+                stats.update(ts, float(value))
+    
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """
+        Current statistics for every metric.
+        
+        Returns:
+            Dictionary of metric -> horizon -> statistics
+        """
+        return {metric: stats.summary() for metric, stats in self.metrics.items()}
+    
+    def save(self):
+        """Persist the state."""
+        save_state(self.state_file, {metric: stats.to_state() for metric, stats in self.metrics.items()})
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - SQLite Store
+Optional indexed storage for metric runs and calendar events (enable with COCKPIT_DB).
+The frontend JSON files are exported from it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+from output_writer import write_json
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_runs (
+    ts INTEGER PRIMARY KEY,                 -- timestamp_unix of the run
+    document TEXT NOT NULL                  -- Output without its metrics (timestamp, summary, stats, ...)
+);
+CREATE TABLE IF NOT EXISTS metric_samples (
+    metric TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL,
+    last_known INTEGER NOT NULL DEFAULT 0,  -- 1 = previous value carried forward (circuit open)
+    UNIQUE (metric, ts)
+);
+CREATE INDEX IF NOT EXISTS idx_metric_samples_ts ON metric_samples (ts);
+CREATE TABLE IF NOT EXISTS calendar_events (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    time TEXT,
+    name TEXT NOT NULL,
+    impact TEXT,
+    forecast TEXT,
+    actual TEXT,
+    previous TEXT,
+    status TEXT NOT NULL,
+    notification_sent_12h INTEGER NOT NULL DEFAULT 0,
+    notification_sent_release INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_calendar_events_date ON calendar_events (date);
+CREATE INDEX IF NOT EXISTS idx_calendar_events_status ON calendar_events (status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+EVENT_COLUMNS = ['id', 'date', 'time', 'name', 'impact', 'forecast', 'actual', 'previous', 'status',
+                 'notification_sent_12h', 'notification_sent_release']
+
+EVENT_FLAGS = ['notification_sent_12h', 'notification_sent_release']
+
+
+class SqliteStore:
+    """SQLite database (WAL mode, so readers never block the writer) for metrics and calendar events."""
+    
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the database.
+        
+        Args:
+            path: Database file path
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; enough in WAL mode
+        self.conn.executescript(SCHEMA)
+        columns = [row['name'] for row in self.conn.execute("PRAGMA table_info(metric_samples)")]
+        if 'last_known' not in columns:  # Databases created before the column existed
+            self.conn.execute("ALTER TABLE metric_samples ADD COLUMN last_known INTEGER NOT NULL DEFAULT 0")
+        self._lock = threading.Lock()
+    
+    def save_metrics_run(self, output: Dict[str, Any], measured: Optional[Dict[str, Any]] = None):
+        """
+        Store one run of fetch_all_metrics.
+        
+        Args:
+            output: Data dictionary from fetch_all_metrics
+            measured: Metric values actually fetched this run (defaults to all of them); the
+                other metrics are stored flagged last_known, so series queries skip them
+        """
+        measured = output['metrics'] if measured is None else measured
+        ts = output['timestamp_unix']
+        document = {key: value for key, value in output.items() if key != 'metrics'}
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO metric_runs (ts, document) VALUES (?, ?)",
+                              (ts, json.dumps(document)))
+            self.conn.execute("DELETE FROM metric_samples WHERE ts = ?", (ts,))
+            self.conn.executemany(
+                "INSERT INTO metric_samples (metric, ts, value, last_known) VALUES (?, ?, ?, ?)",
+                [(metric, ts, value, int(metric not in measured)) for metric, value in output['metrics'].items()]
+            )
+    
+    def latest_metrics_run(self) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild the most recent run's output.
+        
+        Returns:
+            Output dictionary as written to dashboard_data.json, or None if there are no runs
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT ts, document FROM metric_runs ORDER BY ts DESC LIMIT 1").fetchone()
+            if row is None:
+                return None
+            samples = self.conn.execute(
+                "SELECT metric, value FROM metric_samples WHERE ts = ? ORDER BY rowid", (row['ts'],)
+            ).fetchall()
+        
+        document = json.loads(row['document'])
+        output = {key: document[key] for key in ('timestamp', 'timestamp_unix') if key in document}
+        output['metrics'] = {sample['metric']: sample['value'] for sample in samples}
+        output.update({key: value for key, value in document.items() if key not in output})
+        return output
+    
+    def metric_series(self, metric: str, start: Optional[int] = None, end: Optional[int] = None,
+                      include_last_known: bool = False) -> List[tuple]:
+        """
+        Read one metric's samples in a time range (uses the (metric, ts) index).
+        
+        Args:
+            metric: Metric key
+            start: First UNIX timestamp to include
+            end: Last UNIX timestamp to include
+            include_last_known: Also return values carried forward while the source's circuit was open
+        
+        Returns:
+            List of (ts, value) in time order
+        """
+        query, params = "SELECT ts, value FROM metric_samples WHERE metric = ?", [metric]
+        if not include_last_known:
+            query += " AND last_known = 0"
+        if start is not None:
+            query, params = query + " AND ts >= ?", params + [start]
+        if end is not None:
+            query, params = query + " AND ts <= ?", params + [end]
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY ts", params).fetchall()
+        return [(row['ts'], row['value']) for row in rows]
+    
+    def export_dashboard(self, filename: str = "dashboard_data.json") -> bool:
+        """
+        Export the latest run as the frontend's dashboard JSON.
+        
+        Args:
+            filename: Output filename
+        
+        Returns:
+            True if a run was exported
+        """
+        output = self.latest_metrics_run()
+        if output is None:
+            return False
+        write_json(output, filename)
+        return True
+    
+    def upsert_events(self, events: List[Dict[str, Any]], prune_from: Optional[str] = None):
+        """
+        Insert or update calendar events in one transaction.
+        
+        Args:
+            events: Event dictionaries (as produced by the calendar fetcher)
+            prune_from: Also delete the stored events dated on or after this date (YYYY-MM-DD)
+                that are not in events, e.g. events the source dropped or renamed (None = keep them)
+        """
+        placeholders = ', '.join('?' for _ in EVENT_COLUMNS)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in EVENT_COLUMNS[1:])
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO calendar_events ({', '.join(EVENT_COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                [tuple(event.get(column) for column in EVENT_COLUMNS) for event in events]
+            )
+            if prune_from is not None:
+                ids = {event['id'] for event in events}
+                stored = self.conn.execute("SELECT id FROM calendar_events WHERE date >= ?", (prune_from,))
+                stale = [(row['id'],) for row in stored.fetchall() if row['id'] not in ids]
+                self.conn.executemany("DELETE FROM calendar_events WHERE id = ?", stale)
+    
+    def set_event_flag(self, event_id: str, flag: str, value: bool = True):
+        """
+        Update one event's notification flag (a single-row write).
+        
+        Args:
+            event_id: Event ID
+            flag: 'notification_sent_12h' or 'notification_sent_release'
+            value: New flag value
+        """
+        if flag not in EVENT_FLAGS:
+            raise ValueError(f"Unknown event flag: {flag}")
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE calendar_events SET {flag} = ? WHERE id = ?", (int(value), event_id))
+    
+    def load_events(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Read calendar events in a date range (uses the date index).
+        
+        Args:
+            start_date: First date to include (YYYY-MM-DD)
+            end_date: Last date to include (YYYY-MM-DD)
+        
+        Returns:
+            Event dictionaries ordered by date and time
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM calendar_events "
+                "WHERE date BETWEEN ? AND ? ORDER BY date, time, rowid",
+                (start_date or '0000-00-00', end_date or '9999-99-99')
+            ).fetchall()
+        
+        events = []
+        for row in rows:
+            event = dict(row)
+            for flag in EVENT_FLAGS:
+                event[flag] = bool(event[flag])
+            events.append(event)
+        return events
+    
+    def set_meta(self, key: str, value: str):
+        """Store a metadata value (e.g. the calendar's updated_at)."""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a metadata value."""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+    
+    def export_calendar(self, start_date: str, end_date: str, filename: str = "calendar_data.json"):
+        """
+        Export the events in a date range as the frontend's calendar JSON.
+        
+        Args:
+            start_date: First date to include (YYYY-MM-DD)
+            end_date: Last date to include (YYYY-MM-DD)
+            filename: Output filename
+        """
+        write_json({
+            "updated_at": self.get_meta('calendar_updated_at'),
+            "full_refresh_at": self.get_meta('calendar_full_refresh_at') or None,
+            "events": self.load_events(start_date, end_date)
+        }, filename)
+
+
+_store: Optional[SqliteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_sqlite_store() -> Optional[SqliteStore]:
+    """
+    Get the process-wide SQLite store if COCKPIT_DB names a database file.
+    
+    Returns:
+        Shared SqliteStore instance, or None when the JSON files are the only storage
+    """
+    global _store
+    path = os.getenv('COCKPIT_DB', '')
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SqliteStore(path)
+        return _store
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Strategic Cockpit - Local State Store
+Small JSON state files (caches, breaker state) kept between runs in the cache directory.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any
+
+
+# Directory for run-to-run state (override with COCKPIT_CACHE_DIR)
+CACHE_DIR = os.getenv('COCKPIT_CACHE_DIR', '.cache')
+
+
+def cache_path(name: str) -> str:
+    """
+    Build a path inside the cache directory.
+    
+    Args:
+        name: File name
+    
+    Returns:
+        Path to the file under CACHE_DIR
+    """
+    return os.path.join(CACHE_DIR, name)
+
+
+def load_state(path: str, default: Any) -> Any:
+    """
+    Load a JSON state file.
+    
+    Args:
+        path: State file path
+        default: Value returned when the file is missing or unreadable
+    
+    Returns:
+        Parsed state or default
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"⚠️  Failed to load state {path}: {e}")
+        return default
+
+
+def save_state(path: str, data: Any):
+    """
+    Atomically write a JSON state file (write to temp file, then rename).
+    
+    Args:
+        path: State file path
+        data: JSON-serializable state
+    """
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+        os.fchmod(fd, 0o644)  # mkstemp creates 0600; keep the mode a plain open() would give
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"⚠️  Failed to save state {path}: {e}")
@@ -0,0 +1,92 @@
+"""Tests for calendar_parser.parse_event_rows on an investing.com-style fixture."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('lxml')
+
+from calendar_parser import parse_event_rows
+
+
+WINDOW_START = datetime(2026, 10, 12)
+WINDOW_END = datetime(2026, 10, 18, 23, 59, 59)
+
+
+def row(event_id, when, currency='USD', impact='bull3', cells=None):
+    """One calendar row; cells overrides (or, with None, removes) the default cells by class."""
+    default = {
+        'time': f'<td class="first left time js-time">{when[11:16]}</td>',
+        'flagCur': f'<td class="left flagCur noWrap"><span class="ceFlags United_States">&nbsp;</span> {currency}</td>',
+        'sentiment': f'<td class="left textNum sentiment noWrap" data-img_key="{impact}"><i></i></td>',
+        'event': f'<td class="left event"><a href="/x">  Core   CPI (MoM) {event_id} </a></td>',
+        'act': '<td class="bold act pending">3.2%</td>',
+        'fore': '<td class="fore">0.3%</td>',
+        'prev': '<td class="prev"><span title="">0.2%</span></td>'
+    }
+    default.update(cells or {})
+    return (f'<tr id="eventRowId_{event_id}" class="js-event-item" data-event-datetime="{when}">'
+            + ''.join(cell for cell in default.values() if cell is not None) + '</tr>')
+
+
+FIXTURE = ''.join([
+    '<tr><td class="theDay">Monday, October 12, 2026</td></tr>',
+    row(1, '2026/10/12 08:30:00'),
+    row(2, '2026/10/11 23:59:59'),                                 # before the window
+    row(3, '2026/10/19 00:00:00'),                                 # after the window
+    row(4, '2026/10/13 08:30:00', impact='bull2'),                 # medium impact
+    row(5, '2026/10/13 10:00:00', currency='EUR'),                 # other currency
+    row(6, '2026/10/14 14:00:00', cells={'fore': None, 'time': None, 'event': None}),
+    row(7, '2026/10/15 08:30:00', cells={
+        'act': '<td class="bold act">&nbsp;</td>',
+        'fore': '<td class="fore"></td>',
+        'prev': '<td class="prev"><span> 1.1K </span></td>'
+    }),
+    row(8, '2026/10/16 08:30:00', cells={'sentiment': None}),      # no impact cell
+    '<tr class="js-event-item"><td class="event">No datetime</td></tr>'
+])
+
+
+@pytest.fixture(scope='module')
+def parsed():
+    return parse_event_rows(FIXTURE, WINDOW_START, WINDOW_END)
+
+
+def test_counts_every_event_row(parsed):
+    total, _ = parsed
+    assert total == 9
+
+
+def test_keeps_high_impact_usd_rows_inside_the_window(parsed):
+    _, rows = parsed
+    assert [r['name'] for r in rows] == ['Core CPI (MoM) 1', 'Unknown Event', 'Core CPI (MoM) 7']
+
+
+def test_full_row(parsed):
+    _, rows = parsed
+    assert rows[0] == {
+        'datetime': datetime(2026, 10, 12, 8, 30),
+        'name': 'Core CPI (MoM) 1',
+        'time': '08:30',
+        'forecast': '0.3%',
+        'actual': '3.2%',
+        'previous': '0.2%'
+    }
+
+
+def test_missing_cells(parsed):
+    _, rows = parsed
+    assert rows[1]['name'] == 'Unknown Event'
+    assert rows[1]['time'] == '14:00'  # From the datetime attribute
+    assert rows[1]['forecast'] is None
+
+
+def test_blank_values(parsed):
+    _, rows = parsed
+    assert rows[2]['actual'] is None
+    assert rows[2]['forecast'] is None
+    assert rows[2]['previous'] == '1.1K'
+
+
+def test_empty_html():
+    assert parse_event_rows('  ', WINDOW_START, WINDOW_END) == (0, [])
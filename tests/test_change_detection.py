@@ -0,0 +1,56 @@
+"""Tests for change_detection.evaluate_thresholds against the per-metric loop it replaced."""
+
+import random
+
+import pytest
+
+from change_detection import evaluate_thresholds
+
+
+def reference(metrics, old_metrics, new_metrics, thresholds, absolute_metrics):
+    """The original loop: one metric at a time in Python floats."""
+    changed, changes = [], {}
+    for metric in metrics:
+        old, new = old_metrics.get(metric), new_metrics.get(metric)
+        if old is None or new is None:
+            if old != new:
+                changed.append(metric)
+            continue
+        if old == new:
+            continue
+        threshold = thresholds.get(metric, 0)
+        pct = (new - old) / old * 100 if old != 0 else 0
+        exceeded = abs(new - old) >= threshold if metric in absolute_metrics else abs(pct) >= threshold
+        if exceeded:
+            changes[metric] = {'old': old, 'new': new, 'pct_change': pct, 'direction': '▲' if new > old else '▼'}
+            changed.append(metric)
+    return changed, changes
+
+
+VALUES = [None, 0, 0.0, 1, -1, 4.15, 4.2, 1e-300, 5e-324, float('nan'), 1e12, 1e308, -1e308, 3]
+
+
+def random_value(rng):
+    return rng.choice(VALUES) if rng.random() < 0.5 else rng.uniform(-10, 10)
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_matches_reference_loop_on_random_inputs():
+    rng = random.Random(1)
+    for _ in range(5000):
+        metrics = [f"m{i}" for i in range(rng.randint(0, 8))]
+        old = {m: random_value(rng) for m in metrics if rng.random() < 0.9}
+        new = {m: old.get(m) if rng.random() < 0.2 else random_value(rng) for m in metrics}
+        thresholds = {m: rng.choice([0, 0.05, 0.5, 1.0]) for m in metrics if rng.random() < 0.9}
+        absolute = [m for m in metrics if rng.random() < 0.3]
+        
+        expected_changed, expected = reference(metrics, old, new, thresholds, absolute)
+        changed, changes = evaluate_thresholds(metrics, old, new, thresholds, absolute)
+        
+        assert changed == expected_changed
+        assert changes.keys() == expected.keys()
+        for metric, change in changes.items():
+            assert change['old'] is expected[metric]['old']
+            assert change['new'] is expected[metric]['new']
+            assert change['direction'] == expected[metric]['direction']
+            assert change['pct_change'] == pytest.approx(expected[metric]['pct_change'], rel=1e-12, nan_ok=True)
@@ -0,0 +1,60 @@
+"""Tests for http_client request tracking against a local HTTP server."""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import HttpClient, track_requests
+
+
+BODY = b'[' + b','.join(b'{"category": "RWA", "tvl": 12.5}' for _ in range(2000)) + b']'
+GZIPPED = gzip.compress(BODY)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.path == '/gzip':
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(GZIPPED)))
+            self.end_headers()
+            self.wfile.write(GZIPPED)
+            return
+        # Chunked, without Content-Length (like a streamed API response)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(BODY), 4096):
+            chunk = BODY[start:start + 4096]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_compressed_body_counts_decoded_bytes(base_url):
+    with track_requests() as responses:
+        assert HttpClient().get(f"{base_url}/gzip").content == BODY
+    assert responses[0]['bytes'] == len(BODY)
+
+
+def test_streamed_body_without_content_length_is_counted(base_url):
+    with track_requests() as responses:
+        response = HttpClient().get(f"{base_url}/chunked", stream=True)
+        assert b''.join(response.iter_content(1024)) == BODY
+    assert responses[0]['status'] == 200
+    assert responses[0]['bytes'] == len(BODY)
@@ -0,0 +1,34 @@
+"""Tests for json_stream.iter_json_array."""
+
+import json
+
+import pytest
+
+from json_stream import iter_json_array
+
+
+DOCUMENT = '[1.5, -2e3, 10, "a, b]", {"category": "RWA", "tvl": 12.25, "x": [1, 2]}, true, null, "é"]'
+
+
+def one_byte_chunks(text):
+    data = text.encode('utf-8')
+    return [data[i:i + 1] for i in range(len(data))]
+
+
+def test_one_byte_chunks_match_json_loads():
+    assert list(iter_json_array(one_byte_chunks(DOCUMENT))) == json.loads(DOCUMENT)
+
+
+def test_number_split_after_first_digit():
+    assert list(iter_json_array([b'[', b'1', b'.', b'5]'])) == [1.5]
+    assert list(iter_json_array([b'[1', b'2', b'e', b'1, 3', b']'])) == [120.0, 3]
+
+
+def test_keys_reduce_objects():
+    chunks = one_byte_chunks('[{"category": "RWA", "tvl": 5, "name": "x"}]')
+    assert list(iter_json_array(chunks, keys=('category', 'tvl'))) == [{"category": "RWA", "tvl": 5}]
+
+
+def test_unterminated_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array(one_byte_chunks('[1, 2')))
@@ -0,0 +1,29 @@
+"""Tests for metric_history.MetricHistory."""
+
+import pytest
+
+from metric_history import MetricHistory
+
+
+def test_new_registry_metric_widens_existing_file(tmp_path):
+    path = str(tmp_path / 'metrics.bin')
+    history = MetricHistory(path, ['a', 'b'])
+    history.append(1, {'a': 1.0, 'b': 2.0})
+    history.append(2, {'a': 3.0})
+    
+    widened = MetricHistory(path, ['a', 'c', 'b'])
+    assert widened.metrics == ['a', 'b', 'c']
+    widened.append(3, {'a': 5.0, 'b': 6.0, 'c': 7.0})
+    
+    assert MetricHistory(path).read_range() == [
+        (1.0, {'a': 1.0, 'b': 2.0, 'c': None}),
+        (2.0, {'a': 3.0, 'b': None, 'c': None}),
+        (3.0, {'a': 5.0, 'b': 6.0, 'c': 7.0})
+    ]
+
+
+def test_file_without_header_is_rejected(tmp_path):
+    path = tmp_path / 'metrics.bin'
+    path.write_bytes(b'\0' * 56)
+    with pytest.raises(ValueError):
+        MetricHistory(str(path))
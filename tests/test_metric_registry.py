@@ -0,0 +1,40 @@
+"""Tests for metric_registry.MetricEngine source selection and diagnostics."""
+
+import pytest
+
+from metric_registry import MetricEngine, MetricSpec, Request, Source
+from resilience import CircuitBreaker
+
+
+REQUESTS = {
+    'primary_api': Request('primary.example.com', lambda fetcher: 1.0),
+    'fallback_api': Request(None, lambda fetcher: 2.0)
+}
+
+
+def spec(primary_enabled=True):
+    return MetricSpec('metric', 'Metric', [
+        Source(['primary_api'], lambda value: value, 'Primary', enabled=lambda fetcher: primary_enabled),
+        Source(['fallback_api'], lambda value: value, 'Fallback')
+    ], threshold=0, formatter=str, source_name='Primary')
+
+
+@pytest.fixture
+def breaker(tmp_path):
+    return CircuitBreaker(state_file=str(tmp_path / 'circuit_state.json'), failure_threshold=1)
+
+
+def test_primary_records_only_its_request(breaker):
+    outcome = MetricEngine(None, REQUESTS, breaker).run(spec())
+    assert (outcome.source, outcome.label, outcome.requests) == ('primary', 'Primary', ['primary_api'])
+
+
+def test_open_primary_circuit_is_labelled_fallback(breaker):
+    breaker.record_failure('primary.example.com')
+    outcome = MetricEngine(None, REQUESTS, breaker).run(spec())
+    assert (outcome.source, outcome.label, outcome.requests) == ('fallback', 'Fallback', ['fallback_api'])
+
+
+def test_disabled_primary_is_labelled_fallback(breaker):
+    outcome = MetricEngine(None, REQUESTS, breaker).run(spec(primary_enabled=False))
+    assert (outcome.source, outcome.requests) == ('fallback', ['fallback_api'])
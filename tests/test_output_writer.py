@@ -0,0 +1,43 @@
+"""Tests for output_writer.write_json."""
+
+import gzip
+import json
+import os
+import stat
+
+import pytest
+
+from output_writer import write_json
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_files_are_world_readable(tmp_path):
+    path = str(tmp_path / 'data.json')
+    write_json({'a': 1}, path, mode='compact')
+    
+    assert mode(path) == 0o644
+    assert mode(path + '.gz') == 0o644
+    with gzip.open(path + '.gz') as f:
+        assert json.load(f) == {'a': 1}
+
+
+def test_pretty_mode_removes_compressed_siblings(tmp_path):
+    path = str(tmp_path / 'data.json')
+    write_json({'a': 1}, path, mode='compact')
+    write_json({'a': 2}, path, mode='pretty')
+    
+    assert not os.path.exists(path + '.gz')
+    assert not os.path.exists(path + '.br')
+
+
+def test_compact_mode_writes_brotli_sibling(tmp_path):
+    brotli = pytest.importorskip('brotli')
+    path = str(tmp_path / 'data.json')
+    write_json({'a': 1}, path, mode='compact')
+    
+    assert mode(path + '.br') == 0o644
+    with open(path + '.br', 'rb') as f:
+        assert json.loads(brotli.decompress(f.read())) == {'a': 1}
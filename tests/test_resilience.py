@@ -0,0 +1,130 @@
+"""Tests for resilience.call_with_fallback and CircuitBreaker."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from resilience import CircuitBreaker, CircuitOpenError, call_with_fallback
+from state_store import save_state
+
+
+def failing(delay=0.0):
+    def call():
+        time.sleep(delay)
+        raise ValueError("primary down")
+    return call
+
+
+def answering(value, delay=0.0):
+    def call():
+        time.sleep(delay)
+        return value
+    return call
+
+
+def test_fallback_finished_before_primary_fails_is_used():
+    assert call_with_fallback(failing(0.3), answering('fallback'), hedge_delay=0.1) == ('fallback', 'fallback')
+
+
+def test_fallback_after_fast_primary_failure():
+    assert call_with_fallback(failing(), answering('fallback', 0.1), hedge_delay=0.5) == ('fallback', 'fallback')
+
+
+def test_primary_within_hedge_delay():
+    assert call_with_fallback(answering('primary'), answering('fallback'), hedge_delay=0.5) == ('primary', 'primary')
+
+
+def test_both_failing_raises():
+    def fallback():
+        raise KeyError("fallback down")
+    
+    with pytest.raises((ValueError, KeyError)):
+        call_with_fallback(failing(0.1), fallback, hedge_delay=0.05)
+
+
+def breaker(tmp_path, **kwargs):
+    return CircuitBreaker(state_file=str(tmp_path / 'circuit_state.json'), **kwargs)
+
+
+def test_concurrent_failures_count_once_per_run(tmp_path):
+    b = breaker(tmp_path, failure_threshold=2)
+    for _ in range(5):
+        b.record_failure('api.example.com')
+    assert b.allow('api.example.com')
+    assert b.hosts['api.example.com']['failures'] == 1
+    
+    # The next run counts its own failure
+    b = breaker(tmp_path, failure_threshold=2)
+    b.record_failure('api.example.com')
+    assert not b.allow('api.example.com')
+
+
+def open_breaker(tmp_path, cooldown=60):
+    """A breaker whose previous run opened it for api.example.com, with the cooldown over."""
+    b = breaker(tmp_path, failure_threshold=1, cooldown=cooldown)
+    b.record_failure('api.example.com')
+    b.hosts['api.example.com']['opened_at'] -= 2 * cooldown
+    save_state(b.state_file, b.hosts)
+    return breaker(tmp_path, failure_threshold=1, cooldown=cooldown)
+
+
+def test_half_open_trial_admits_the_whole_run(tmp_path):
+    b = open_breaker(tmp_path)
+    assert b.available('api.example.com')
+    assert b.hosts['api.example.com']['state'] == CircuitBreaker.OPEN
+    
+    # Concurrent calls of the trial run (e.g. calendar chunks) all go through
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def request():
+        barrier.wait()
+        return 'ok'
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(b.call, 'api.example.com', request) for _ in range(3)]
+        assert [future.result() for future in futures] == ['ok'] * 3
+    assert b.hosts['api.example.com']['state'] == CircuitBreaker.CLOSED
+
+
+def test_half_open_sibling_after_trial_success_goes_through(tmp_path):
+    b = open_breaker(tmp_path)
+    assert b.call('api.example.com', lambda: 'trial') == 'trial'
+    assert b.call('api.example.com', lambda: 'sibling') == 'sibling'
+
+
+def test_failed_trial_reopens(tmp_path):
+    b = breaker(tmp_path, failure_threshold=1, cooldown=0)
+    b.record_failure('api.example.com')
+    assert b.allow('api.example.com')
+    b.record_failure('api.example.com')
+    assert b.hosts['api.example.com']['state'] == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker(tmp_path, failure_threshold=1, cooldown=60).call('api.example.com', lambda: 'refused')
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+@pytest.mark.parametrize('error, counted', [
+    (requests.ConnectionError("refused"), True),
+    (requests.Timeout("read timed out"), True),
+    (http_error(503), True),
+    (http_error(429), True),
+    (http_error(404), False),
+    (ValueError("unexpected markup"), False)
+])
+def test_only_host_failures_count(tmp_path, error, counted):
+    b = breaker(tmp_path, failure_threshold=1)
+    
+    def request():
+        raise error
+    
+    with pytest.raises(type(error)):
+        b.call('api.example.com', request)
+    assert (b.hosts['api.example.com']['state'] == CircuitBreaker.OPEN) is counted
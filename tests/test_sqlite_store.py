@@ -0,0 +1,37 @@
+"""Tests for sqlite_store.SqliteStore metric samples."""
+
+import sqlite3
+
+from sqlite_store import SqliteStore
+
+
+def run(ts, btc, yield_10y):
+    return {
+        "timestamp": f"run {ts}",
+        "timestamp_unix": ts,
+        "metrics": {"bitcoin_price": btc, "us_10y_yield": yield_10y}
+    }
+
+
+def test_last_known_values_are_flagged(tmp_path):
+    store = SqliteStore(str(tmp_path / 'cockpit.db'))
+    store.save_metrics_run(run(1, 60000.0, 4.2))
+    output = run(2, 60000.0, 4.3)
+    store.save_metrics_run(output, {"us_10y_yield": 4.3})  # bitcoin_price carried forward
+    
+    assert store.metric_series("bitcoin_price") == [(1, 60000.0)]
+    assert store.metric_series("bitcoin_price", include_last_known=True) == [(1, 60000.0), (2, 60000.0)]
+    assert store.metric_series("us_10y_yield") == [(1, 4.2), (2, 4.3)]
+    assert store.latest_metrics_run()["metrics"] == output["metrics"]
+
+
+def test_adds_flag_column_to_existing_database(tmp_path):
+    path = str(tmp_path / 'cockpit.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE metric_samples (metric TEXT NOT NULL, ts INTEGER NOT NULL, value REAL, "
+                 "UNIQUE (metric, ts))")
+    conn.execute("INSERT INTO metric_samples VALUES ('bitcoin_price', 1, 60000.0)")
+    conn.commit()
+    conn.close()
+    
+    assert SqliteStore(path).metric_series("bitcoin_price") == [(1, 60000.0)]